@@ -0,0 +1,143 @@
+from operator import attrgetter
+
+
+class UnknownFields(ValueError):
+    """В `?fields=` запрошены поля, которых нет в ответе API."""
+
+
+class ApiField:
+    """
+    Поле ответа API.
+
+    Аргументы:
+        getter: функция, получающая значение поля из объекта.
+        columns: колонки, которые нужно выбрать из БД (для `only()`).
+        related: связи, которые нужно подгрузить (для `select_related()`).
+    """
+
+    def __init__(self, getter, columns=(), related=()):
+        self.getter = getter
+        self.columns = tuple(columns)
+        self.related = tuple(related)
+
+    @classmethod
+    def column(cls, name):
+        """Поле, значение которого хранится в одноимённой колонке."""
+        return cls(attrgetter(name), columns=(name,))
+
+
+class Serializer:
+    """
+    Превращает объекты модели в словари для JSON.
+
+    Клиент выбирает поля параметром `?fields=`; запрос к БД выбирает
+    только колонки и связи, нужные этим полям.
+    """
+
+    fields = {}
+
+    def parse_fields(self, raw):
+        """Список полей из значения `?fields=`; пусто — все поля."""
+        names = list(dict.fromkeys(
+            name.strip() for name in (raw or '').split(',') if name.strip()
+        ))
+        if not names:
+            return list(self.fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise UnknownFields(
+                f'Неизвестные поля: {", ".join(unknown)}. '
+                f'Доступны: {", ".join(self.fields)}.'
+            )
+        return names
+
+    def prepare(self, queryset, names, columns=()):
+        """
+        Ограничивает запрос колонками и связями полей `names`.
+
+        `columns` — колонки, которые нужны представлению помимо полей,
+        например ключ сортировки курсора.
+        """
+        fields = [self.fields[name] for name in names]
+        related = sorted({name for field in fields for name in field.related})
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(
+            'pk', *columns,
+            *(name for field in fields for name in field.columns)
+        )
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].getter(obj) for name in names}
+
+
+def _image_url(post):
+    return post.image.url if post.image else None
+
+
+def _category(post):
+    if post.category is None:
+        return None
+    return {'slug': post.category.slug, 'title': post.category.title}
+
+
+def _location(post):
+    # Как и в шаблонах, снятая с публикации локация не показывается.
+    if post.location is None or not post.location.is_published:
+        return None
+    return post.location.name
+
+
+class PostSerializer(Serializer):
+    fields = {
+        'id': ApiField.column('id'),
+        'title': ApiField.column('title'),
+        'text': ApiField.column('text'),
+        'pub_date': ApiField.column('pub_date'),
+        'image': ApiField(_image_url, columns=('image',)),
+        'comment_count': ApiField.column('comment_count'),
+        'author': ApiField(
+            attrgetter('author.username'),
+            columns=('author__username',),
+            related=('author',),
+        ),
+        'category': ApiField(
+            _category,
+            columns=('category__slug', 'category__title'),
+            related=('category',),
+        ),
+        'location': ApiField(
+            _location,
+            columns=('location__name', 'location__is_published'),
+            related=('location',),
+        ),
+    }
+
+
+class CommentSerializer(Serializer):
+    fields = {
+        'id': ApiField.column('id'),
+        'text': ApiField.column('text'),
+        'created_at': ApiField.column('created_at'),
+        'author': ApiField(
+            attrgetter('author.username'),
+            columns=('author__username',),
+            related=('author',),
+        ),
+    }
+
+
+class CategorySerializer(Serializer):
+    fields = {
+        'slug': ApiField.column('slug'),
+        'title': ApiField.column('title'),
+        'description': ApiField.column('description'),
+    }
+
+
+class ProfileSerializer(Serializer):
+    fields = {
+        'username': ApiField.column('username'),
+        'first_name': ApiField.column('first_name'),
+        'last_name': ApiField.column('last_name'),
+    }
@@ -0,0 +1,40 @@
+from django.urls import path
+
+from api import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.PostListView.as_view(), name='posts'),
+    path(
+        'posts/<int:pk>/',
+        views.PostDetailView.as_view(),
+        name='post_detail'
+    ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
+    path('categories/', views.CategoryListView.as_view(), name='categories'),
+    path(
+        'categories/<slug:category_slug>/',
+        views.CategoryDetailView.as_view(),
+        name='category'
+    ),
+    path(
+        'categories/<slug:category_slug>/posts/',
+        views.CategoryPostListView.as_view(),
+        name='category_posts'
+    ),
+    path(
+        'profiles/<str:user_name>/',
+        views.ProfileDetailView.as_view(),
+        name='profile'
+    ),
+    path(
+        'profiles/<str:user_name>/posts/',
+        views.ProfilePostListView.as_view(),
+        name='profile_posts'
+    ),
+]
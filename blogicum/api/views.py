@@ -0,0 +1,242 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from api.serializers import (
+    CategorySerializer, CommentSerializer, PostSerializer, ProfileSerializer,
+    UnknownFields)
+from blog.models import Category, Comment, Post, User
+from blog.paginators import InvalidCursor, KeysetPaginator
+from blog.utils import (
+    detailed_post_permission, get_post_info, visible_comments)
+from constants import QNT_API_MAX_PAGE_SIZE, QNT_API_PAGE_SIZE
+
+# Ответы без пробелов и без экранирования кириллицы: меньше байт
+# и до, и после сжатия.
+JSON_DUMPS_PARAMS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая возвращается клиенту в теле ответа."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+@method_decorator(gzip_page, name='dispatch')
+class ApiView(View):
+    """
+    Базовое представление API: только чтение, ответы и ошибки в JSON.
+
+    Поля ответа выбираются параметром `?fields=`.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    serializer = None
+    queryset = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return json_response({'error': 'Не найдено.'}, status=404)
+        except ApiError as error:
+            return json_response({'error': str(error)}, status=error.status)
+
+    def get_fields(self):
+        try:
+            return self.serializer.parse_fields(self.request.GET.get('fields'))
+        except UnknownFields as error:
+            raise ApiError(str(error))
+
+    def get_queryset(self):
+        """Как в generic-представлениях Django: копия `queryset`."""
+        if self.queryset is None:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__} требует атрибут `queryset` '
+                'или метод get_queryset().'
+            )
+        return self.queryset.all()
+
+
+class ApiDetailView(ApiView):
+    """
+    Один объект из `get_queryset()`.
+
+    Объект ищется по полю `lookup_field` со значением из URL-параметра
+    `lookup_url_kwarg`; `columns` — колонки, которые нужны представлению
+    помимо полей ответа.
+    """
+
+    lookup_field = 'pk'
+    lookup_url_kwarg = 'pk'
+    columns = ()
+
+    def get_object(self, fields):
+        return get_object_or_404(
+            self.serializer.prepare(
+                self.get_queryset(), fields, columns=self.columns),
+            **{self.lookup_field: self.kwargs[self.lookup_url_kwarg]},
+        )
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        return json_response(
+            self.serializer.serialize(self.get_object(fields), fields))
+
+
+class ApiListView(ApiView):
+    """
+    Список объектов с курсорной пагинацией.
+
+    Ответ: `{"results": [...], "next": курсор, "previous": курсор}`;
+    курсор передаётся обратно параметром `?cursor=`, размер страницы —
+    параметром `?limit=`.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    def get_limit(self):
+        limit = self.request.GET.get('limit')
+        if limit is None:
+            return QNT_API_PAGE_SIZE
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= QNT_API_MAX_PAGE_SIZE:
+            raise ApiError(
+                f'limit должен быть от 1 до {QNT_API_MAX_PAGE_SIZE}.')
+        return limit
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        paginator = KeysetPaginator(
+            self.serializer.prepare(
+                self.get_queryset(),
+                fields,
+                columns=(name.lstrip('-') for name in self.ordering),
+            ),
+            self.get_limit(),
+            self.ordering,
+        )
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError('Некорректный курсор.')
+        return json_response({
+            'results': [
+                self.serializer.serialize(obj, fields) for obj in page
+            ],
+            'next': page.next_cursor or None,
+            'previous': page.previous_cursor or None,
+        })
+
+
+class PostListView(ApiListView):
+    """Лента всех публикаций, как на главной странице."""
+
+    serializer = PostSerializer()
+
+    def get_queryset(self):
+        # Фильтр видимости зависит от текущего времени.
+        return get_post_info(order_by_pub_date=False, join_related=False)
+
+
+class CategoryPostListView(ApiListView):
+    """Лента публикаций категории."""
+
+    serializer = PostSerializer()
+
+    def get_queryset(self):
+        category = get_object_or_404(
+            Category.objects.only('pk'),
+            slug=self.kwargs['category_slug'],
+            is_published=True,
+        )
+        return get_post_info(
+            category.posts, order_by_pub_date=False, join_related=False)
+
+
+class ProfilePostListView(ApiListView):
+    """Публикации автора; сам автор видит и скрытые."""
+
+    serializer = PostSerializer()
+
+    def get_queryset(self):
+        user = get_object_or_404(
+            User.objects.only('pk'), username=self.kwargs['user_name'])
+        return get_post_info(
+            user.posts,
+            apply_default_filters=self.request.user != user,
+            order_by_pub_date=False,
+            join_related=False,
+        )
+
+
+class PostDetailView(ApiDetailView):
+    """Публикация; скрытая доступна только автору."""
+
+    serializer = PostSerializer()
+    queryset = Post.objects.all()
+    columns = ('author', 'is_visible', 'pub_date')
+
+    def get_object(self, fields):
+        post = super().get_object(fields)
+        if not detailed_post_permission(post, self.request.user):
+            raise Http404
+        return post
+
+
+class CommentListView(ApiListView):
+    """Комментарии к публикации, старые сверху."""
+
+    serializer = CommentSerializer()
+    ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        post = get_object_or_404(
+            Post.objects.only('author', 'is_visible', 'pub_date'),
+            pk=self.kwargs['pk'],
+        )
+        if not detailed_post_permission(post, self.request.user):
+            raise Http404
+        # Не `post.comments`: связанный менеджер читает `post_id` каждого
+        # комментария, а `only()` эту колонку откладывает.
+        return visible_comments(
+            Comment.objects.filter(post=post), self.request.user)
+
+
+class CategoryListView(ApiListView):
+    """Опубликованные категории."""
+
+    serializer = CategorySerializer()
+    queryset = Category.objects.filter(is_published=True)
+    ordering = ('slug',)
+
+
+class CategoryDetailView(ApiDetailView):
+    """Опубликованная категория."""
+
+    serializer = CategorySerializer()
+    queryset = Category.objects.filter(is_published=True)
+    lookup_field = 'slug'
+    lookup_url_kwarg = 'category_slug'
+
+
+class ProfileDetailView(ApiDetailView):
+    """Профиль пользователя."""
+
+    serializer = ProfileSerializer()
+    queryset = User.objects.all()
+    lookup_field = 'username'
+    lookup_url_kwarg = 'user_name'
@@ -1,9 +1,14 @@
 from django.contrib import admin
+from django.db import transaction
 from django.urls import reverse
 from django.utils.html import format_html
 
 from constants import ADMIN_TEXT_LENGTH
-from .models import Category, Comment, Location, Post
+from .admin_filters import AutocompleteFilter, AutocompleteFilterMixin
+from .models import Category, Comment, ImageJob, Location, Post
+from .moderation import MODERATIONS
+from .stats import recount_author_stats
+from .utils import change_comment_count
 
 
 @admin.display(description="Текст")
@@ -11,8 +16,41 @@ def short_version_text(obj):
     return f"{obj.text}"[:ADMIN_TEXT_LENGTH] + '...'
 
 
+class ModerationAdminMixin:
+    """
+    Массовая модерация выбранных объектов пачками.
+
+    Публикация, снятие с публикации и удаление выполняются через
+    blog.moderation: по одному UPDATE или DELETE на пачку вместо
+    сохранения каждого объекта.
+    """
+
+    moderation_kind = None
+    actions = ('publish_selected', 'unpublish_selected')
+
+    def _moderate(self, request, action, queryset):
+        processed = MODERATIONS[self.moderation_kind].apply(action, queryset)
+        self.message_user(request, f'Обработано объектов: {processed}.')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',))
+    def publish_selected(self, request, queryset):
+        self._moderate(request, 'publish', queryset)
+
+    @admin.action(
+        description='Снять с публикации выбранные', permissions=('change',))
+    def unpublish_selected(self, request, queryset):
+        self._moderate(request, 'unpublish', queryset)
+
+    def delete_queryset(self, request, queryset):
+        MODERATIONS[self.moderation_kind].apply('delete', queryset)
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    ModerationAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin
+):
+    moderation_kind = 'posts'
     empty_value_display = 'Не задано'
     list_display = (
         'title',
@@ -23,17 +61,23 @@ class PostAdmin(admin.ModelAdmin):
         'created_at',
         'category',
         'image',
+        'comment_count',
     )
     list_editable = (
         'is_published',
     )
     search_fields = ('title',)
-    list_filter = ('category',)
+    list_filter = (('category', AutocompleteFilter),)
+    autocomplete_fields = ('author', 'category', 'location')
     list_display_links = ('title',)
+    # Без явного списка Django подгрузит только обязательные связи,
+    # и категория (null=True) запрашивалась бы для каждой строки.
+    list_select_related = ('author', 'category')
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ModerationAdminMixin, admin.ModelAdmin):
+    moderation_kind = 'categories'
     list_display = (
         'title',
         'description',
@@ -43,10 +87,12 @@ class CategoryAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
     )
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(ModerationAdminMixin, admin.ModelAdmin):
+    moderation_kind = 'locations'
     list_display = (
         'name',
         'created_at',
@@ -55,10 +101,14 @@ class LocationAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
     )
+    search_fields = ('name',)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(
+    ModerationAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin
+):
+    moderation_kind = 'comments'
     list_display = (
         'link_to_author',
         short_version_text,
@@ -70,8 +120,35 @@ class CommentAdmin(admin.ModelAdmin):
         'is_published',
     )
     search_fields = ('post__title',)
-    list_filter = ('post',)
+    list_filter = (('post', AutocompleteFilter),)
+    autocomplete_fields = ('author', 'post')
     list_display_links = (short_version_text,)
+    # Ссылки на публикацию и автора строятся для каждой строки.
+    list_select_related = ('author', 'post')
+
+    def get_queryset(self, request):
+        # Для ссылки на публикацию нужен только заголовок, а текст
+        # публикации бывает длинным.
+        return super().get_queryset(request).defer('post__text')
+
+    def save_model(self, request, obj, form, change):
+        # В форме списка (list_editable) есть только `is_published`:
+        # остальные поля не менялись.
+        old_post_id = form.initial.get('post', obj.post_id)
+        old_author_id = form.initial.get('author', obj.author_id)
+        was_published = form.initial.get('is_published', obj.is_published)
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            # Добавление и удаление учитывают сигналы, перенос и снятие
+            # с публикации — нет.
+            if change and (old_post_id, was_published) != (
+                    obj.post_id, obj.is_published):
+                if was_published:
+                    change_comment_count(old_post_id, -1)
+                if obj.is_published:
+                    change_comment_count(obj.post_id, 1)
+            if change and old_author_id != obj.author_id:
+                recount_author_stats([old_author_id, obj.author_id])
 
     @admin.display(description='Ссылка на пост')
     def link_to_post(self, obj):
@@ -94,3 +171,39 @@ class CommentAdmin(admin.ModelAdmin):
             )
             return format_html('<a href="{}">{}</a>', url, author)
         return "-"
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'created_at',
+        'finished_at',
+        'error',
+    )
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    readonly_fields = (
+        'post',
+        'image',
+        'status',
+        'attempts',
+        'error',
+        'created_at',
+        'started_at',
+        'finished_at',
+    )
+    actions = ('retry',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Повторить обработку')
+    def retry(self, request, queryset):
+        updated = queryset.exclude(
+            status=ImageJob.Status.PROCESSING
+        ).update(status=ImageJob.Status.PENDING, attempts=0, error='')
+        self.message_user(request, f'Поставлено в очередь: {updated}.')
@@ -0,0 +1,58 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр списка объектов по связи с поиском через autocomplete.
+
+    В отличие от стандартного фильтра по связи, не выводит все связанные
+    объекты: значение выбирается поиском, как в полях `autocomplete_fields`,
+    и на странице загружается только выбранный объект. У админки связанной
+    модели должны быть заданы `search_fields`.
+    """
+
+    template = 'admin/blog/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(
+            field, request, params, model, model_admin, field_path)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg]),
+            'display': 'Все',
+        }
+
+    def render_widget(self):
+        return self.form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val)
+
+
+class AutocompleteFilterMixin:
+    """Подключает к странице админки скрипты AutocompleteFilter."""
+
+    @property
+    def media(self):
+        # Поле виджету нужно только для отрисовки, не для скриптов.
+        return (
+            super().media
+            + AutocompleteSelect(None, self.admin_site).media
+            + forms.Media(js=['js/autocomplete_filter.js'])
+        )
@@ -0,0 +1,103 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+TAG_KEY_PREFIX = 'tag'
+PAGE_KEY_PREFIX = 'page'
+# Тег главной ленты: сбрасывается при изменении набора публикаций.
+FEED_TAG = 'feed'
+# GET-параметры, от которых зависит содержимое кэшируемых страниц.
+PAGE_CACHE_PARAMS = ('page', 'cursor', 'comments_cursor')
+
+
+def tag(kind, pk):
+    """Тег кэша для объекта, например `post:15`."""
+    return f'{kind}:{pk}'
+
+
+def _tag_key(name):
+    return f'{TAG_KEY_PREFIX}:{name}'
+
+
+def get_tag_versions(tags):
+    """
+    Возвращает словарь «тег — версия» одним запросом к кэшу.
+
+    Версия — случайный токен, поэтому потеря ключа версии
+    (вытеснение из кэша) равносильна сбросу тега.
+    """
+    keys = {_tag_key(name): name for name in tags}
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_tags(*tags):
+    """Сбрасывает все фрагменты кэша, зависящие от тегов."""
+    cache.set_many(
+        {_tag_key(name): uuid4().hex for name in tags}, timeout=None)
+
+
+def post_tags(post):
+    """Теги, от которых зависит отображение карточки публикации."""
+    return [
+        tag('post', post.pk),
+        tag('category', post.category_id),
+        tag('location', post.location_id),
+        tag('user', post.author_id),
+    ]
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет публикациям `card_version` для кэша карточек.
+
+    Версии всех карточек страницы читаются одним обращением к кэшу.
+    """
+    posts = list(posts)
+    versions = get_tag_versions(
+        {name for post in posts for name in post_tags(post)})
+    for post in posts:
+        post.card_version = '.'.join(
+            versions[name] for name in post_tags(post))
+    return posts
+
+
+def page_cache_key(request):
+    """Ключ кэша страницы: путь и параметры пагинации из запроса."""
+    params = '&'.join(
+        f'{name}={request.GET[name]}'
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    )
+    url = md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'{PAGE_KEY_PREFIX}:{url}'
+
+
+def get_cached_page(key):
+    """Возвращает страницу из кэша, если ни один её тег не сброшен."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    versions, response = entry
+    if get_tag_versions(versions) != versions:
+        return None
+    return response
+
+
+def set_cached_page(key, response, tags, timeout):
+    """Сохраняет отрисованную страницу вместе с версиями её тегов."""
+    cached = HttpResponse(
+        response.content,
+        content_type=response.get('Content-Type'),
+        status=response.status_code,
+    )
+    # Валидаторы нужны для ответов 304 на страницы из кэша.
+    for header in ('ETag', 'Last-Modified'):
+        if header in response:
+            cached.headers[header] = response[header]
+    cache.set(key, (get_tag_versions(tags), cached), timeout)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, кэш которых не виден другим процессам.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кэш должен быть общим для всех процессов.
+
+    Команды cron и воркеров сбрасывают теги кэша из своего процесса;
+    с кэшем в памяти веб-процессы этого не увидят, и карточки, страницы
+    и момент ближайшей публикации останутся устаревшими до истечения срока.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f'Кэш `{backend}` не общий для процессов: сброс кэша командами '
+            'process_scheduled_posts, process_image_jobs, moderate '
+            'и bulk_loaddata не дойдёт до веб-процессов.',
+            hint=(
+                'Задайте BLOGICUM_CACHE_BACKEND и BLOGICUM_CACHE_LOCATION '
+                '(Memcached или DatabaseCache).'
+            ),
+            id='blog.W001',
+        )
+    ]
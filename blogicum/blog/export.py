@@ -0,0 +1,91 @@
+import csv
+import json
+from datetime import date, datetime
+
+from blog.models import Comment, Post
+from constants import EXPORT_CHUNK_SIZE
+
+# Выгружаемые данные: колонка -> поле или путь через связь.
+# Автор, категория и локация разворачиваются в строку выгрузки,
+# чтобы аналитикам не приходилось соединять таблицы.
+EXPORTS = {
+    'posts': (Post, {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'is_published': 'is_published',
+        'is_visible': 'is_visible',
+        'comment_count': 'comment_count',
+        'image': 'image',
+        'author_id': 'author_id',
+        'author': 'author__username',
+        'category_id': 'category_id',
+        'category_slug': 'category__slug',
+        'category_title': 'category__title',
+        'location_id': 'location_id',
+        'location': 'location__name',
+    }),
+    'comments': (Comment, {
+        'id': 'id',
+        'post_id': 'post_id',
+        'post_title': 'post__title',
+        'text': 'text',
+        'created_at': 'created_at',
+        'is_published': 'is_published',
+        'author_id': 'author_id',
+        'author': 'author__username',
+    }),
+}
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_rows(kind, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки выгрузки в порядке первичного ключа.
+
+    `iterator()` читает результат пачками (в PostgreSQL — серверным
+    курсором), поэтому память не зависит от размера таблицы.
+    """
+    model, columns = EXPORTS[kind]
+    return (
+        model.objects.order_by('pk')
+        .values_list(*columns.values())
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def export_lines(kind, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки файла выгрузки в формате `jsonl` или `csv`."""
+    names = list(EXPORTS[kind][1])
+    rows = export_rows(kind, chunk_size)
+    if export_format == 'jsonl':
+        for row in rows:
+            yield json.dumps(
+                dict(zip(names, map(_serialize, row))),
+                ensure_ascii=False,
+                separators=(',', ':'),
+            ) + '\n'
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(map(_serialize, row))
@@ -0,0 +1,160 @@
+from calendar import timegm
+from hashlib import md5
+
+from django.contrib.syndication.views import Feed
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from blog.cache import FEED_TAG, get_tag_versions, tag
+from blog.models import Category, User
+from blog.utils import get_post_info
+from constants import QNT_FEED_ITEMS
+
+
+class ConditionalFeed(Feed):
+    """
+    Лента публикаций с поддержкой условных GET-запросов.
+
+    ETag и Last-Modified считаются по дате самой новой видимой публикации
+    и версиям тегов кэша, поэтому ответ 304 обходится без выборки
+    и отрисовки публикаций.
+    """
+
+    def get_queryset(self, obj):
+        return get_post_info()
+
+    def get_cache_tags(self, obj):
+        # Любое изменение публикации сбрасывает тег главной ленты.
+        return [FEED_TAG]
+
+    def items(self, obj):
+        return self.get_queryset(obj)[:QNT_FEED_ITEMS]
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.text
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_author_name(self, post):
+        return post.author.get_username()
+
+    def item_categories(self, post):
+        return [post.category.title] if post.category else []
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404('Feed object does not exist.')
+
+        latest = (
+            self.get_queryset(obj)
+            .values_list('pub_date', flat=True)
+            .first()
+        )
+        versions = get_tag_versions(self.get_cache_tags(obj))
+        etag = quote_etag(md5(
+            f'{latest}:{sorted(versions.items())}'.encode()).hexdigest())
+        last_modified = timegm(latest.utctimetuple()) if latest else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            feedgen = self.get_feed(obj, request)
+            response = HttpResponse(content_type=feedgen.content_type)
+            feedgen.write(response, 'utf-8')
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class PostsFeed(ConditionalFeed):
+    """RSS-лента всех публикаций."""
+
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума.'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryPostsFeed(ConditionalFeed):
+    """RSS-лента публикаций категории."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def get_queryset(self, category):
+        return get_post_info(category.posts)
+
+    def get_cache_tags(self, category):
+        return [
+            tag('category_feed', category.pk), tag('category', category.pk)]
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+
+class ProfilePostsFeed(ConditionalFeed):
+    """RSS-лента публикаций автора."""
+
+    def get_object(self, request, user_name):
+        return get_object_or_404(User, username=user_name)
+
+    def get_queryset(self, user):
+        # В ленту попадают только видимые всем публикации, даже для автора.
+        return get_post_info(user.posts)
+
+    def get_cache_tags(self, user):
+        return [FEED_TAG, tag('user', user.pk)]
+
+    def title(self, user):
+        return f'Блогикум: публикации @{user.username}'
+
+    def description(self, user):
+        return f'Новые публикации пользователя @{user.username}.'
+
+    def link(self, user):
+        return reverse('blog:profile', args=[user.username])
+
+
+class PostsAtomFeed(PostsFeed):
+    """Atom-лента всех публикаций."""
+
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    """Atom-лента публикаций категории."""
+
+    feed_type = Atom1Feed
+
+    def subtitle(self, category):
+        return self.description(category)
+
+
+class ProfilePostsAtomFeed(ProfilePostsFeed):
+    """Atom-лента публикаций автора."""
+
+    feed_type = Atom1Feed
+
+    def subtitle(self, user):
+        return self.description(user)
@@ -1,10 +1,20 @@
 from django import forms
 from django.forms import DateTimeInput
 
+from constants import POST_IMAGE_MAX_BYTES
 from .models import Comment, Post, User
 
 
 class PostForm(forms.ModelForm):
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if image and image.size > POST_IMAGE_MAX_BYTES:
+            raise forms.ValidationError(
+                'Размер фото не должен превышать '
+                f'{POST_IMAGE_MAX_BYTES // (1024 * 1024)} МБ.'
+            )
+        return image
+
     class Meta:
         model = Post
         exclude = ['author']
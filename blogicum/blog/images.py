@@ -0,0 +1,131 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from constants import (
+    POST_IMAGE_MAX_PIXELS, POST_IMAGE_QUALITY, POST_IMAGE_VARIANTS)
+
+# Формат производного файла: расширение -> (формат Pillow, MIME-тип).
+# WebP идёт первым: браузер выбирает первый поддерживаемый <source>,
+# последний формат (JPEG) попадает в сам <img>.
+IMAGE_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+# Форматы оригиналов, которые пересохраняются без EXIF. Анимированные
+# GIF не трогаем: Pillow сохранил бы только первый кадр.
+STRIP_METADATA_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+# Пары «вариант для 1x — вариант для 2x» для атрибута srcset.
+PICTURE_SIZES = {
+    'card': ('card', 'detail'),
+    'detail': ('detail', 'retina'),
+}
+
+
+class ImageProcessingError(Exception):
+    """Фото нельзя обработать: файл повреждён или слишком велик."""
+
+
+def derivative_name(name, variant, extension):
+    """
+    Имя производного файла рядом с оригиналом.
+
+    `posts_images/photo.png` -> `posts_images/photo.card.webp`.
+    """
+    return f'{os.path.splitext(name)[0]}.{variant}.{extension}'
+
+
+def _replace(storage, name, content):
+    # FileSystemStorage не перезаписывает файлы, а подбирает новое имя.
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, content)
+
+
+def _encode(image, pillow_format, width=None):
+    image = image.copy()
+    if width is not None:
+        # Без увеличения: маленький оригинал только перекодируется.
+        image.thumbnail((width, width * 10), Image.LANCZOS)
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(
+        buffer, pillow_format, quality=POST_IMAGE_QUALITY, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+def _open(storage, name):
+    try:
+        with storage.open(name) as original:
+            image = Image.open(original)
+            width, height = image.size
+            if width * height > POST_IMAGE_MAX_PIXELS:
+                raise ImageProcessingError(
+                    f'Фото {width}x{height} больше допустимых '
+                    f'{POST_IMAGE_MAX_PIXELS} пикселей.'
+                )
+            has_metadata = bool(image.getexif())
+            pillow_format = image.format
+            # Поворот по EXIF, иначе фото с телефона окажется на боку.
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except Image.DecompressionBombError as error:
+        raise ImageProcessingError(str(error))
+    except (OSError, UnidentifiedImageError):
+        raise ImageProcessingError('Файл не является изображением.')
+    return image, pillow_format, has_metadata
+
+
+def process_image(name, storage=default_storage):
+    """
+    Обрабатывает загруженное фото публикации.
+
+    Проверяет размер, убирает из оригинала EXIF (в том числе координаты
+    съёмки) и создаёт все варианты во всех форматах. Функция не обращается
+    к базе данных, поэтому её можно выполнять в отдельном процессе.
+    """
+    image, pillow_format, has_metadata = _open(storage, name)
+    if has_metadata and pillow_format in STRIP_METADATA_FORMATS:
+        _replace(storage, name, _encode(image, pillow_format))
+    for variant, width in POST_IMAGE_VARIANTS.items():
+        for extension, (variant_format, _) in IMAGE_FORMATS.items():
+            _replace(
+                storage,
+                derivative_name(name, variant, extension),
+                _encode(image, variant_format, width),
+            )
+
+
+def picture_sources(field_file, size):
+    """
+    Источники для тега <picture>: MIME-тип, srcset и src варианта 1x.
+
+    Пока воркер не создал варианты, возвращается только оригинал.
+    """
+    storage = field_file.storage
+    names = {
+        extension: [
+            derivative_name(field_file.name, variant, extension)
+            for variant in PICTURE_SIZES[size]
+        ]
+        for extension in IMAGE_FORMATS
+    }
+    if not all(
+        storage.exists(name) for group in names.values() for name in group
+    ):
+        return [{'type': None, 'srcset': '', 'src': field_file.url}]
+    return [
+        {
+            'type': mime_type,
+            'srcset': ', '.join(
+                f'{storage.url(name)} {density}'
+                for name, density in zip(names[extension], ('1x', '2x'))
+            ),
+            'src': storage.url(names[extension][0]),
+        }
+        for extension, (_, mime_type) in IMAGE_FORMATS.items()
+    ]
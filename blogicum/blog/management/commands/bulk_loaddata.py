@@ -0,0 +1,252 @@
+import json
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
+from django.utils.timezone import now
+
+from blog.cache import FEED_TAG, bump_tags
+from blog.utils import NEXT_VISIBILITY_CHANGE_KEY
+
+LOADED_MODELS = (
+    get_user_model()._meta.label_lower,
+    'blog.category',
+    'blog.location',
+    'blog.post',
+    'blog.comment',
+)
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Элементы JSON-массива по одному, без чтения файла целиком.
+
+    В памяти держится только недочитанный хвост буфера и текущий элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    expected = '['
+    while True:
+        buffer = buffer.lstrip()
+        if buffer.startswith(']') and expected != '[':
+            return
+        if buffer and expected in '[,':
+            if buffer[0] != expected:
+                raise ValueError(
+                    f'Ожидался символ «{expected}», найден «{buffer[0]}».')
+            buffer = buffer[1:]
+            expected = 'item'
+            continue
+        if buffer and expected == 'item':
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Элемент не поместился в буфер целиком: дочитываем.
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                expected = ','
+                continue
+        if eof:
+            raise ValueError('Файл закончился раньше JSON-массива.')
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+@contextmanager
+def fixture_dates(models):
+    """
+    Отключает auto_now и auto_now_add на время загрузки.
+
+    Как и loaddata, сохраняем даты из фикстуры, а не время загрузки.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    try:
+        for field, _, _ in fields:
+            field.auto_now = field.auto_now_add = False
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ModelLoader:
+    """Превращает записи фикстуры одной модели в несохранённые объекты."""
+
+    def __init__(self, model):
+        self.model = model
+        opts = model._meta
+        self.auto_dates = [
+            field for field in opts.concrete_fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        self.fields = {
+            field.name: field
+            for field in (*opts.concrete_fields, *opts.many_to_many)
+        }
+
+    def build(self, record):
+        """Объект модели и строки промежуточных таблиц many-to-many."""
+        fields = record.get('fields', {})
+        obj = self.model(pk=self.model._meta.pk.to_python(record.get('pk')))
+        through_rows = []
+        for name, value in fields.items():
+            field = self.fields.get(name)
+            if field is None:
+                raise CommandError(
+                    f'У модели {self.model._meta.label} нет поля `{name}`.')
+            if field.many_to_many:
+                through_rows.extend(self._through_rows(field, obj.pk, value))
+            elif field.is_relation:
+                # Связь хранится как первичный ключ: проверку целостности
+                # выполнит БД при фиксации транзакции.
+                setattr(obj, field.attname, None if value is None else
+                        field.target_field.to_python(value))
+            else:
+                setattr(obj, field.attname, field.to_python(value))
+        for field in self.auto_dates:
+            if field.name not in fields:
+                setattr(obj, field.attname, now())
+        return obj, through_rows
+
+    @staticmethod
+    def _through_rows(field, pk, values):
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        return [
+            through(**{f'{source}_id': pk, f'{target}_id': value})
+            for value in values
+        ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстрая замена loaddata для больших дампов в формате db.json: '
+        'читает JSON потоково и вставляет пользователей, категории, '
+        'локации, публикации и комментарии через bulk_create пачками '
+        'в одной транзакции. Сигналы не отправляются, поэтому после '
+        'загрузки пересчитываются счётчики комментариев, видимость '
+        'публикаций, поисковый индекс и статистика авторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-фикстуре.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество объектов одной модели в одном INSERT.',
+        )
+
+    def handle(self, *args, fixture, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        self.batch_size = batch_size
+        self.verbosity = options['verbosity']
+        self.loaders = {
+            label: ModelLoader(apps.get_model(label))
+            for label in LOADED_MODELS
+        }
+        self.pending = {}
+        self.loaded = {}
+
+        try:
+            with open(fixture, encoding='utf-8') as stream:
+                skipped = self.load(stream)
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать фикстуру: {error}')
+        except (ValueError, ValidationError) as error:
+            raise CommandError(f'Некорректная фикстура: {error}')
+        except DatabaseError as error:
+            raise CommandError(
+                f'Загрузка отменена: {error}. Загружайте в пустую БД: '
+                'существующие объекты bulk_create не обновляет.'
+            )
+
+        self.stdout.write(
+            f'Загружено объектов: {sum(self.loaded.values())}, '
+            f'пропущено записей других моделей: {skipped}.'
+        )
+        self.post_process()
+
+    def load(self, stream):
+        """Загружает фикстуру; возвращает число пропущенных записей."""
+        skipped = 0
+        models = [loader.model for loader in self.loaders.values()]
+        with fixture_dates(models), transaction.atomic():
+            for record in iter_json_array(stream):
+                if not isinstance(record, dict):
+                    raise ValueError('Запись фикстуры должна быть объектом.')
+                loader = self.loaders.get(str(record.get('model')).lower())
+                if loader is None:
+                    skipped += 1
+                    continue
+                obj, through_rows = loader.build(record)
+                self.add(obj)
+                for row in through_rows:
+                    self.add(row)
+            for model in list(self.pending):
+                self.flush(model)
+            self.reset_sequences()
+        return skipped
+
+    def add(self, obj):
+        model = type(obj)
+        batch = self.pending.setdefault(model, [])
+        batch.append(obj)
+        if len(batch) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.pending.pop(model, [])
+        if not batch:
+            return
+        model.objects.bulk_create(batch, batch_size=self.batch_size)
+        label = model._meta.label
+        self.loaded[label] = self.loaded.get(label, 0) + len(batch)
+        if self.verbosity:
+            self.stdout.write(f'{label}: {self.loaded[label]}')
+
+    def reset_sequences(self):
+        # Первичные ключи взяты из фикстуры: без сброса последовательности
+        # PostgreSQL выдаст новому объекту уже занятый ключ.
+        models = [apps.get_model(label) for label in self.loaded]
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def post_process(self):
+        """Пересчитывает то, что при обычном сохранении делают сигналы."""
+        options = {'stdout': self.stdout, 'verbosity': self.verbosity}
+        call_command('recount_comments', **options)
+        call_command('refresh_post_visibility', **options)
+        call_command('rebuild_search_index', **options)
+        call_command('rebuild_author_stats', **options)
+        bump_tags(FEED_TAG)
+        # Загруженные отложенные публикации меняют расписание, даже если
+        # флаги видимости в фикстуре были верны.
+        cache.delete(NEXT_VISIBILITY_CHANGE_KEY)
+        self.stdout.write(
+            'Фото публикаций не обрабатывались; поставьте их в очередь: '
+            'process_image_jobs --enqueue-missing.'
+        )
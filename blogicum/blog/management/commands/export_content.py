@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import EXPORT_FORMATS, EXPORTS, export_lines
+from constants import EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации или комментарии в JSONL или CSV с автором, '
+        'категорией и локацией в каждой строке. Строки читаются из БД '
+        'пачками, поэтому память не зависит от размера таблицы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(EXPORTS))
+        parser.add_argument(
+            '--format',
+            dest='export_format',
+            choices=list(EXPORT_FORMATS),
+            default='jsonl',
+            help='Формат выгрузки.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки; по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за раз.',
+        )
+
+    def handle(
+        self, *args, kind, export_format, output, chunk_size, **options
+    ):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        lines = export_lines(kind, export_format, chunk_size)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        # newline='': csv.writer сам завершает строки `\r\n`.
+        with open(output, 'w', encoding='utf-8', newline='') as stream:
+            stream.writelines(lines)
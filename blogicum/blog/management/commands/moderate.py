@@ -0,0 +1,93 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from blog.moderation import ACTIONS, MODERATIONS, ModerationError
+from constants import MODERATION_CHUNK_SIZE
+
+
+def moment(value):
+    """Дата `ГГГГ-ММ-ДД` или дата и время в ISO 8601."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = day and datetime.combine(day, time.min)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(value)
+    return make_aware(parsed) if is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово публикует, снимает с публикации или удаляет публикации, '
+        'комментарии, категории или локации по фильтру. Объекты '
+        'обрабатываются пачками, по одному UPDATE или DELETE на пачку; '
+        'кэш и счётчики обновляются. С --dry-run только считает объекты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(MODERATIONS))
+        parser.add_argument('action', choices=ACTIONS)
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument(
+            '--since',
+            type=moment,
+            help='Не раньше этого момента (дата публикации или создания).',
+        )
+        parser.add_argument(
+            '--until',
+            type=moment,
+            help='Раньше этого момента (дата публикации или создания).',
+        )
+        parser.add_argument('--category', help='Идентификатор категории.')
+        parser.add_argument(
+            '--text', help='Подстрока текста, заголовка или названия.')
+        parser.add_argument(
+            '--all',
+            dest='all_objects',
+            action='store_true',
+            help='Разрешить действие без фильтров — над всеми объектами.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=MODERATION_CHUNK_SIZE,
+            help='Сколько объектов менять одним запросом.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать подходящие объекты.',
+        )
+
+    def handle(
+        self, *args, kind, action, chunk_size, dry_run, all_objects,
+        **options
+    ):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        filters = {
+            name: options[name]
+            for name in ('author', 'since', 'until', 'category', 'text')
+            if options[name] is not None
+        }
+        if not filters and not all_objects:
+            raise CommandError(
+                'Задайте хотя бы один фильтр или явно укажите --all.')
+
+        moderation = MODERATIONS[kind]
+        try:
+            queryset = moderation.filter(**filters)
+        except ModerationError as error:
+            raise CommandError(str(error))
+
+        if dry_run:
+            self.stdout.write(f'Подходит объектов: {queryset.count()}.')
+            return
+        processed = moderation.apply(action, queryset, chunk_size)
+        self.stdout.write(f'Обработано объектов: {processed}.')
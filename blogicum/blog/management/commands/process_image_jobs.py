@@ -0,0 +1,163 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.timezone import now
+
+from blog.cache import bump_tags, tag
+from blog.images import ImageProcessingError, process_image
+from blog.models import ImageJob, Post
+from constants import IMAGE_JOB_MAX_ATTEMPTS, IMAGE_JOB_TIMEOUT
+
+
+def run_job(name):
+    """
+    Выполняется в дочернем процессе.
+
+    Возвращает пару: повторять ли задачу бессмысленно и текст ошибки.
+    """
+    try:
+        process_image(name)
+    except ImageProcessingError as error:
+        return True, str(error)
+    except Exception as error:
+        return False, repr(error)
+    return False, ''
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь фото публикаций: проверка размера, удаление '
+        'EXIF и уменьшенные копии. Фото обрабатываются в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов; 0 — обрабатывать в текущем.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Сколько задач забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать накопившиеся задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--enqueue-missing',
+            action='store_true',
+            help='Поставить в очередь фото, которые ещё не обрабатывались.',
+        )
+
+    def handle(
+        self, *args, workers, batch_size, sleep, once, enqueue_missing,
+        **options
+    ):
+        if workers < 0 or batch_size < 1:
+            raise CommandError(
+                '--workers не может быть отрицательным, '
+                '--batch-size должен быть больше нуля.'
+            )
+        if enqueue_missing:
+            self.enqueue_missing()
+
+        executor = None
+        if workers:
+            # Дочерние процессы не должны наследовать соединения с БД.
+            connections.close_all()
+            executor = ProcessPoolExecutor(workers)
+        processed = 0
+        try:
+            while True:
+                jobs = self.claim_jobs(batch_size)
+                if jobs:
+                    self.run_jobs(executor, jobs)
+                    processed += len(jobs)
+                elif once:
+                    break
+                else:
+                    time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(f'Обработано задач: {processed}.')
+
+    def enqueue_missing(self):
+        posts = (
+            Post.objects.exclude(image='')
+            .exclude(image_jobs__isnull=False)
+            .values_list('pk', 'image')
+        )
+        ImageJob.objects.bulk_create(
+            (ImageJob(post_id=pk, image=image)
+             for pk, image in posts.iterator()),
+            batch_size=1000,
+        )
+
+    def claim_jobs(self, batch_size):
+        """Забирает задачи из очереди, не мешая параллельным воркерам."""
+        stale = now() - timedelta(seconds=IMAGE_JOB_TIMEOUT)
+        candidates = (
+            ImageJob.objects.filter(
+                Q(status=ImageJob.Status.PENDING)
+                | Q(status=ImageJob.Status.PROCESSING, started_at__lt=stale)
+            )
+            .order_by('created_at')
+            .values_list('pk', 'status', 'started_at')[:batch_size]
+        )
+        claimed = [
+            pk for pk, status, started_at in candidates
+            # Задачу получает тот, чей UPDATE изменил строку.
+            if ImageJob.objects.filter(
+                pk=pk, status=status, started_at=started_at
+            ).update(
+                status=ImageJob.Status.PROCESSING,
+                started_at=now(),
+                attempts=F('attempts') + 1,
+            )
+        ]
+        return list(ImageJob.objects.filter(pk__in=claimed))
+
+    def run_jobs(self, executor, jobs):
+        current = set(
+            Post.objects.filter(pk__in={job.post_id for job in jobs})
+            .values_list('pk', 'image')
+        )
+        actual = [job for job in jobs if (job.post_id, job.image) in current]
+        names = [job.image for job in actual]
+        results = (executor.map(run_job, names) if executor
+                   else map(run_job, names))
+        outcome = dict(zip((job.pk for job in actual), results))
+
+        for job in jobs:
+            # Фото успели заменить: задача на новый файл уже в очереди.
+            invalid, error = outcome.get(job.pk, (True, 'Фото заменено.'))
+            if error and not invalid and job.attempts < IMAGE_JOB_MAX_ATTEMPTS:
+                job.status = ImageJob.Status.PENDING
+            elif error:
+                job.status = ImageJob.Status.FAILED
+            else:
+                job.status = ImageJob.Status.DONE
+            job.error = error
+            job.finished_at = now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            if job.status == ImageJob.Status.DONE:
+                bump_tags(tag('post', job.post_id))
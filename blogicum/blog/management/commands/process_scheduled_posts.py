@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from blog.cache import FEED_TAG, bump_tags, tag
+from blog.models import Post
+from blog.stats import refresh_authors
+from blog.utils import visibility_cutoff
+from constants import PAGE_CACHE_TIMEOUT
+
+LAST_RUN_KEY = 'scheduled_posts:last_run'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает кэш лент и страниц и пересчитывает статистику авторов '
+        'для отложенных публикаций, время публикации которых наступило '
+        'с прошлого запуска. '
+        'Запускайте по расписанию, например раз в минуту.'
+    )
+
+    def handle(self, *args, **options):
+        current = now()
+        # Страницы живут в кэше не дольше PAGE_CACHE_TIMEOUT,
+        # поэтому более ранние публикации проверять незачем.
+        oldest = current - timedelta(seconds=PAGE_CACHE_TIMEOUT)
+        since = max(cache.get(LAST_RUN_KEY, oldest), oldest)
+
+        # Публикация видна, когда `pub_date` меньше отметки
+        # visibility_cutoff(), поэтому сравниваем с отметками запусков.
+        crossed = Post.objects.filter(
+            is_visible=True,
+            pub_date__gte=visibility_cutoff(since),
+            pub_date__lt=visibility_cutoff(current),
+        ).values_list('pk', 'category_id', 'author_id')
+
+        tags = {FEED_TAG}
+        author_ids = set()
+        published = 0
+        for pk, category_id, author_id in crossed.iterator():
+            tags.update((tag('post', pk), tag('category_feed', category_id)))
+            author_ids.add(author_id)
+            published += 1
+        if published:
+            bump_tags(*tags)
+            refresh_authors(author_ids)
+        cache.set(LAST_RUN_KEY, current, timeout=None)
+
+        self.stdout.write(f'Опубликовано по расписанию: {published}.')
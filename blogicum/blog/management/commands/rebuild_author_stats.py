@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.models import User
+from blog.stats import save_author_stats, stale_author_stats
+from constants import AUTHOR_STATS_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику авторов (публикации, комментарии, '
+        'последняя публикация) пачками пользователей. '
+        'С флагом --check только сообщает о расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AUTHOR_STATS_BATCH_SIZE,
+            help='Количество пользователей в одной пачке.',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Проверить статистику без исправления.',
+        )
+
+    def handle(self, *args, batch_size, check, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+
+        checked = mismatched = 0
+        last_pk = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_pk = user_ids[-1]
+            stale = stale_author_stats(user_ids)
+            checked += len(user_ids)
+            mismatched += len(stale)
+            if stale and not check:
+                with transaction.atomic():
+                    save_author_stats(stale)
+
+        self.stdout.write(
+            f'Проверено пользователей: {checked}, '
+            f'с неверной статистикой: {mismatched}.'
+        )
+        if check and mismatched:
+            raise CommandError('Статистика авторов расходится с данными.')
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.models import Post, SearchTerm
+from blog.search import post_terms
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс публикаций пачками. Нужен после '
+        'миграции 0008_search_index, которая создаёт пустой индекс, '
+        'и после массовых изменений в обход сигналов (bulk_create, update).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество публикаций в одной пачке.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+
+        indexed = 0
+        last_pk = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'title', 'text')[:batch_size]
+            )
+            if not posts:
+                break
+            last_pk = posts[-1][0]
+            with transaction.atomic():
+                SearchTerm.objects.filter(
+                    post_id__in=[pk for pk, _, _ in posts]).delete()
+                SearchTerm.objects.bulk_create(
+                    (
+                        SearchTerm(post_id=pk, term=term, weight=weight)
+                        for pk, title, text in posts
+                        for term, weight in post_terms(title, text).items()
+                    ),
+                    batch_size=1000,
+                )
+            indexed += len(posts)
+
+        self.stdout.write(f'Проиндексировано публикаций: {indexed}.')
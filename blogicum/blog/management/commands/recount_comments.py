@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from blog.cache import bump_tags, tag
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает поле `comment_count` (опубликованные комментарии) '
+        'публикаций пачками. '
+        'С флагом --check только сообщает о расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество публикаций в одной пачке.',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Проверить счётчики без исправления.',
+        )
+
+    def handle(self, *args, batch_size, check, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+
+        checked = mismatched = 0
+        last_pk = 0
+        while True:
+            stored = dict(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'comment_count')[:batch_size]
+            )
+            if not stored:
+                break
+            last_pk = max(stored)
+            actual = dict(
+                Comment.objects.filter(post_id__in=stored, is_published=True)
+                .order_by()
+                .values('post_id')
+                .annotate(total=Count('pk'))
+                .values_list('post_id', 'total')
+            )
+            wrong = [
+                Post(pk=pk, comment_count=actual.get(pk, 0))
+                for pk, count in stored.items()
+                if actual.get(pk, 0) != count
+            ]
+            checked += len(stored)
+            mismatched += len(wrong)
+            if wrong and not check:
+                with transaction.atomic():
+                    Post.objects.bulk_update(wrong, ['comment_count'])
+                # Карточки и страницы исправленных публикаций в кэше.
+                bump_tags(*(tag('post', post.pk) for post in wrong))
+
+        self.stdout.write(
+            f'Проверено публикаций: {checked}, '
+            f'с неверным счётчиком: {mismatched}.'
+        )
+        if check and mismatched:
+            raise CommandError('Счётчики комментариев расходятся с данными.')
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.cache import FEED_TAG, bump_tags, tag
+from blog.stats import refresh_authors
+from blog.utils import (
+    NEXT_VISIBILITY_CHANGE_KEY, post_count_cache_key,
+    stale_visibility_querysets)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает флаг `is_visible` публикаций после изменений '
+        'в обход сигналов. С флагом --check только сообщает о расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Проверить флаги без исправления.',
+        )
+
+    def handle(self, *args, check, **options):
+        show, hide = stale_visibility_querysets()
+        if check:
+            mismatched = show.count() + hide.count()
+        else:
+            with transaction.atomic():
+                changed = set(
+                    show.values_list('pk', 'category_id', 'author_id')
+                ) | set(hide.values_list('pk', 'category_id', 'author_id'))
+                mismatched = (
+                    show.update(is_visible=True)
+                    + hide.update(is_visible=False)
+                )
+                refresh_authors({author_id for *_, author_id in changed})
+            if mismatched:
+                category_ids = {category_id for _, category_id, _ in changed}
+                bump_tags(
+                    FEED_TAG,
+                    *(tag('post', pk) for pk, *_ in changed),
+                    *(tag('category_feed', pk) for pk in category_ids),
+                )
+                cache.delete_many([
+                    NEXT_VISIBILITY_CHANGE_KEY,
+                    post_count_cache_key('index'),
+                    *(
+                        post_count_cache_key('category', pk)
+                        for pk in category_ids
+                    ),
+                ])
+
+        self.stdout.write(f'Публикаций с неверным флагом: {mismatched}.')
+        if check and mismatched:
+            raise CommandError('Флаги видимости расходятся с данными.')
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Только схема: индекс строится кодом приложения, который меняется
+# со временем, поэтому после миграции заполните его командой
+# `python manage.py rebuild_search_index`.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_image_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+                'default_related_name': 'search_terms',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='search_term_post_uniq'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max, Q
+from django.utils.timezone import now
+
+
+def fill_author_stats(apps, schema_editor):
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    Comment = apps.get_model('blog', 'Comment')
+    Post = apps.get_model('blog', 'Post')
+    stats = {}
+    public = Q(is_visible=True, pub_date__lt=now())
+    posts = (
+        Post.objects.order_by()
+        .values('author_id')
+        .annotate(
+            total=Count('pk'),
+            visible=Count('pk', filter=public),
+            last=Max('pub_date', filter=public),
+        )
+    )
+    for row in posts:
+        stats[row['author_id']] = AuthorStats(
+            user_id=row['author_id'],
+            post_count=row['total'],
+            visible_post_count=row['visible'],
+            last_post_at=row['last'],
+            updated_at=now(),
+        )
+    comments = (
+        Comment.objects.order_by()
+        .values('author_id')
+        .annotate(total=Count('pk'))
+        .values_list('author_id', 'total')
+    )
+    for author_id, total in comments:
+        stats.setdefault(
+            author_id, AuthorStats(user_id=author_id, updated_at=now())
+        ).comment_count = total
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user', verbose_name='Пользователь')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('visible_post_count', models.PositiveIntegerField(default=0, help_text='Публикации, которые сейчас видны в лентах; отложенные учитываются, когда наступит время их публикации.', verbose_name='Видимых публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_post_at', models.DateTimeField(blank=True, help_text='Дата публикации последней видимой в лентах публикации.', null=True, verbose_name='Последняя публикация')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,268 @@
-from django.contrib.auth.mixins import UserPassesTestMixin
+from hashlib import md5
+
+from django.contrib.auth.mixins import (
+    PermissionRequiredMixin, UserPassesTestMixin)
+from django.http import Http404
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date, quote_etag
+
+from blog.cache import (
+    attach_card_versions, get_cached_page, get_tag_versions, page_cache_key,
+    set_cached_page)
+from blog.paginators import InvalidCursor, KeysetPaginator, PostPaginator
+from blog.utils import (
+    detailed_post_permission, feed_cache_timeout, get_post_info,
+    next_visibility_change, visible_comments)
+from constants import (
+    PAGE_CACHE_TIMEOUT, POSTS_COUNT_MODE, POSTS_PAGINATION_MODE,
+    QNT_COMMENTS_ON_PAGE)
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
-    """Миксин для проверки авторства для доступа к действию."""
+    """
+    Миксин для проверки авторства для доступа к действию.
+
+    Объект загружается один раз за запрос вместе со связями
+    из `related_fields`.
+    """
+
+    related_fields = ('author',)
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(*self.related_fields)
+
+    def get_object(self, queryset=None):
+        # test_func(), get()/post() и get_success_url() работают
+        # с одним объектом.
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
 
     def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
+        return self.get_object().author == self.request.user
 
     def handle_no_permission(self):
         return redirect('blog:post_detail', pk=self.kwargs['pk'])
+
+
+class KeysetPaginationMixin:
+    """
+    Миксин для ListView с курсорной пагинацией.
+
+    При `pagination_mode = 'keyset'` страница выбирается по GET-параметру
+    `cursor` вместо номера страницы `page`.
+    """
+
+    pagination_mode = POSTS_PAGINATION_MODE
+    keyset_ordering = ('-pub_date', '-id')
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination_mode != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PostCountPaginationMixin:
+    """
+    Миксин для ListView с дешёвым подсчётом количества публикаций.
+
+    Количество считается по `get_count_queryset()` и кэшируется
+    по ключу `get_count_cache_key()`.
+    """
+
+    paginator_class = PostPaginator
+    count_mode = POSTS_COUNT_MODE
+
+    def get_count_queryset(self):
+        return None
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_queryset=self.get_count_queryset(),
+            cache_key=self.get_count_cache_key(),
+            count_mode=self.count_mode,
+            **kwargs
+        )
+
+
+class PostVisibilityMixin(PermissionRequiredMixin):
+    """
+    Миксин для представлений одной публикации.
+
+    Публикация загружается один раз вместе с категорией, локацией
+    и автором; скрытая публикация доступна только её автору.
+    """
+
+    def get_queryset(self):
+        return get_post_info(
+            apply_default_filters=False,
+            order_by_pub_date=False
+        )
+
+    def get_object(self, queryset=None):
+        # has_permission() и DetailView.get() работают с одним объектом.
+        if not hasattr(self, '_post'):
+            self._post = super().get_object(queryset)
+        return self._post
+
+    def has_permission(self):
+        flag = detailed_post_permission(self.get_object(), self.request.user)
+        return flag
+
+    def handle_no_permission(self):
+        raise Http404()
+
+
+class CommentsPaginationMixin:
+    """
+    Миксин для курсорной пагинации комментариев публикации.
+
+    Снятые с публикации комментарии видит только их автор.
+    """
+
+    comments_per_page = QNT_COMMENTS_ON_PAGE
+    comments_cursor_kwarg = 'comments_cursor'
+
+    def get_comments_page(self, post):
+        paginator = KeysetPaginator(
+            visible_comments(
+                post.comments.select_related('author'), self.request.user),
+            self.comments_per_page,
+            ordering=('created_at', 'id'),
+        )
+        try:
+            return paginator.page(
+                self.request.GET.get(self.comments_cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор комментариев.')
+
+
+class PostCardCacheMixin:
+    """Миксин для ListView: готовит версии кэша карточек публикаций."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_card_versions(context['object_list'])
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """
+    Миксин для кэширования страниц целиком для анонимных посетителей.
+
+    Страница хранится вместе с версиями тегов из `get_page_cache_tags()`
+    и считается устаревшей, как только любой из тегов сброшен сигналами.
+    Срок хранения не превышает времени до появления ближайшей отложенной
+    публикации: от неё зависят ленты и боковая панель категорий,
+    которая есть на каждой странице.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_tags(self, context):
+        return []
+
+    def get_page_cache_timeout(self):
+        return feed_cache_timeout(self.page_cache_timeout)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        response = get_cached_page(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            tags = self.get_page_cache_tags(response.context_data)
+            timeout = self.get_page_cache_timeout()
+            response.add_post_render_callback(
+                lambda rendered: set_cached_page(key, rendered, tags, timeout)
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для ответов 304 Not Modified на условные GET-запросы.
+
+    Валидаторы считаются по контексту уже выбранной страницы, до отрисовки
+    шаблона: Last-Modified — наибольшее `updated_at` объектов
+    из `get_conditional_objects()`, ETag — их идентификаторы и время
+    изменения, версии тегов кэша из `get_conditional_tags()` и пользователь,
+    потому что шапка и кнопки автора зависят от того, кто вошёл. ETag
+    учитывает и момент появления ближайшей отложенной публикации: с ним
+    меняется боковая панель категорий.
+
+    Лентам Last-Modified не подходит: публикация, ушедшая со страницы,
+    или отложенная публикация, появившаяся на ней, не меняют `updated_at`
+    остальных. Такие представления отключают его через
+    `conditional_last_modified` и отдают только ETag.
+    """
+
+    conditional_last_modified = True
+
+    def get_conditional_objects(self, context):
+        return []
+
+    def get_conditional_tags(self, context):
+        return []
+
+    def get_validators(self, context):
+        objects = [
+            obj for obj in self.get_conditional_objects(context)
+            if obj is not None
+        ]
+        last_modified = None
+        if self.conditional_last_modified:
+            last_modified = max(
+                (obj.updated_at for obj in objects), default=None)
+        tags = self.get_conditional_tags(context)
+        state = [
+            self.request.user.pk,
+            [(obj._meta.label, obj.pk, obj.updated_at) for obj in objects],
+            sorted(get_tag_versions(tags).items()) if tags else [],
+            next_visibility_change(),
+        ]
+        etag = quote_etag(md5(repr(state).encode()).hexdigest())
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or (
+                response.status_code != 200):
+            return response
+
+        if hasattr(response, 'context_data'):
+            etag, last_modified = self.get_validators(response.context_data)
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(
+                    last_modified.timestamp())
+        # Страница, отданная из кэша, уже содержит свои валидаторы.
+        last_modified = response.get('Last-Modified')
+        conditional = get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=last_modified and parse_http_date(last_modified),
+            response=response,
+        )
+        patch_vary_headers(conditional, ('Cookie',))
+        return conditional
@@ -2,14 +2,18 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
 
-from constants import OBJ_NAME_LENGTH
+from constants import OBJ_NAME_LENGTH, SEARCH_TERM_LENGTH
 
 
 User = get_user_model()
 
 
 class PublishableModel(models.Model):
-    """Абстрактная модель. Добавляет флаг is_published и время создания."""
+    """
+    Абстрактная модель.
+
+    Добавляет флаг is_published, время создания и последнего изменения.
+    """
 
     is_published = models.BooleanField(
         default=True,
@@ -19,6 +23,9 @@ class PublishableModel(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -92,12 +99,44 @@ class Post(PublishableModel):
         db_index=True,
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    # Учитываются только опубликованные комментарии.
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    # Публикация и её категория опубликованы. Поддерживается сигналами,
+    # чтобы ленты не соединяли таблицу категорий ради фильтра.
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна в лентах',
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ["-pub_date"]
+        indexes = [
+            # Главная лента: только видимые, новые сверху.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_published_feed_idx',
+            ),
+            # Лента категории.
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            # Профиль автора: автор видит и неопубликованные посты.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:OBJ_NAME_LENGTH]
@@ -114,6 +153,8 @@ class Comment(PublishableModel):
         verbose_name='Дата и время публикации',
         auto_now_add=True
     )
+    # Изменение комментария отражается в `updated_at` публикации.
+    updated_at = None
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -130,6 +171,12 @@ class Comment(PublishableModel):
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         res = (
@@ -137,3 +184,132 @@ class Comment(PublishableModel):
             f'{self.post}: {self.text[:OBJ_NAME_LENGTH]}...'
         )
         return res
+
+
+class SearchTerm(models.Model):
+    """Запись обратного индекса поиска: основа слова в публикации."""
+
+    term = models.CharField(
+        max_length=SEARCH_TERM_LENGTH, verbose_name='Основа слова'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+    )
+    weight = models.PositiveIntegerField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        default_related_name = 'search_terms'
+        constraints = [
+            # Уникальный индекс заодно служит для поиска по слову.
+            models.UniqueConstraint(
+                fields=['term', 'post'],
+                name='search_term_post_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.term} ({self.weight})'
+
+
+class ImageJob(models.Model):
+    """Задача фоновой обработки фото публикации."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+    )
+    image = models.CharField(max_length=255, verbose_name='Файл')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Добавлено'
+    )
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Начало обработки'
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Окончание обработки'
+    )
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('-created_at',)
+        default_related_name = 'image_jobs'
+        indexes = [
+            # Выборка очереди воркером.
+            models.Index(
+                fields=['status', 'created_at'],
+                name='imagejob_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class AuthorStats(models.Model):
+    """
+    Счётчики автора для страницы профиля.
+
+    Поддерживаются при записи публикаций и комментариев, чтобы профиль
+    не считал агрегаты при каждом просмотре; пересчитываются командой
+    rebuild_author_stats.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    post_count = models.PositiveIntegerField(
+        default=0, verbose_name='Публикаций'
+    )
+    visible_post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Видимых публикаций',
+        help_text=(
+            'Публикации, которые сейчас видны в лентах; отложенные '
+            'учитываются, когда наступит время их публикации.'
+        ),
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0, verbose_name='Комментариев'
+    )
+    last_post_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя публикация',
+        help_text='Дата публикации последней видимой в лентах публикации.',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'Статистика {self.user}'
@@ -0,0 +1,267 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from blog.cache import FEED_TAG, bump_tags, tag
+from blog.models import Category, Comment, ImageJob, Location, Post, SearchTerm
+from blog.stats import recount_author_stats, refresh_authors
+from blog.utils import (
+    NEXT_VISIBILITY_CHANGE_KEY, change_comment_count, post_count_cache_key,
+    sync_category_visibility)
+from constants import MODERATION_CHUNK_SIZE
+
+ACTIONS = ('publish', 'unpublish', 'delete')
+
+
+class ModerationError(ValueError):
+    """Фильтр не поддерживается для выбранной модели."""
+
+
+def _raw_delete(queryset):
+    # Один DELETE без загрузки объектов и без сигналов: связанные
+    # объекты удаляются (или отвязываются) явно до вызова.
+    return queryset._raw_delete(queryset.db)
+
+
+class Moderation:
+    """
+    Массовая модерация объектов одной модели по фильтру.
+
+    Объекты обрабатываются пачками по первичному ключу, каждая пачка —
+    один UPDATE или DELETE в своей транзакции. Сигналы моделей при этом
+    не отправляются, поэтому кэш, `is_visible`, счётчики комментариев
+    и статистика авторов поддерживаются явно, по одному разу на пачку.
+
+    Атрибуты с путями полей задают, какие фильтры поддерживает модель;
+    None — фильтр недоступен. По умолчанию публикация меняет поле
+    `published_field`, а удаление — одна команда DELETE; наследники
+    дополняют их связанными объектами и сбросом кэша в `_invalidate()`.
+    """
+
+    model = None
+    published_field = 'is_published'
+    author_field = None
+    date_field = 'created_at'
+    category_field = None
+    text_fields = ()
+
+    def filter(
+        self, queryset=None, author=None, since=None, until=None,
+        category=None, text=None
+    ):
+        """Объекты, подходящие под фильтр; без фильтров — все объекты."""
+        if queryset is None:
+            queryset = self.model.objects.all()
+        lookups = {}
+        for value, field, name in (
+            (author, self.author_field, 'автору'),
+            (category, self.category_field, 'категории'),
+        ):
+            if value is None:
+                continue
+            if field is None:
+                raise ModerationError(
+                    f'{self.model._meta.verbose_name_plural} '
+                    f'нельзя отфильтровать по {name}.'
+                )
+            lookups[field] = value
+        if since is not None:
+            lookups[f'{self.date_field}__gte'] = since
+        if until is not None:
+            lookups[f'{self.date_field}__lt'] = until
+        queryset = queryset.filter(**lookups)
+        if text:
+            condition = Q()
+            for field in self.text_fields:
+                condition |= Q(**{f'{field}__icontains': text})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def chunks(self, queryset, chunk_size=MODERATION_CHUNK_SIZE):
+        """Первичные ключи объектов запроса пачками по возрастанию."""
+        last_pk = None
+        queryset = queryset.order_by('pk').values_list('pk', flat=True)
+        while True:
+            page = queryset if last_pk is None else queryset.filter(
+                pk__gt=last_pk)
+            pks = list(page[:chunk_size])
+            if not pks:
+                return
+            last_pk = pks[-1]
+            yield pks
+
+    def apply(self, action, queryset, chunk_size=MODERATION_CHUNK_SIZE):
+        """Выполняет действие над объектами запроса; возвращает их число."""
+        if action not in ACTIONS:
+            raise ModerationError(f'Неизвестное действие: {action}.')
+        processed = 0
+        for pks in self.chunks(queryset, chunk_size):
+            with transaction.atomic():
+                if action == 'delete':
+                    self.delete(pks)
+                else:
+                    self.set_published(pks, action == 'publish')
+            processed += len(pks)
+        return processed
+
+    def set_published(self, pks, is_published):
+        updates = {self.published_field: is_published}
+        if any(
+            field.name == 'updated_at'
+            for field in self.model._meta.concrete_fields
+        ):
+            updates['updated_at'] = now()
+        self.model.objects.filter(pk__in=pks).update(**updates)
+        self._invalidate(pks)
+
+    def delete(self, pks):
+        _raw_delete(self.model.objects.filter(pk__in=pks))
+        self._invalidate(pks)
+
+    def _invalidate(self, pks):
+        """Сбрасывает кэш, зависящий от объектов; по умолчанию такого нет."""
+
+
+class PostModeration(Moderation):
+    model = Post
+    author_field = 'author__username'
+    date_field = 'pub_date'
+    category_field = 'category__slug'
+    text_fields = ('title', 'text')
+
+    def _invalidate(self, pks):
+        posts = list(
+            Post.objects.filter(pk__in=pks)
+            .values_list('category_id', 'author_id')
+        )
+        self._invalidate_posts(pks, posts)
+
+    @staticmethod
+    def _invalidate_posts(pks, posts):
+        category_ids = {category_id for category_id, _ in posts} - {None}
+        author_ids = {author_id for _, author_id in posts}
+        bump_tags(
+            FEED_TAG,
+            *(tag('post', pk) for pk in pks),
+            *(tag('category_feed', pk) for pk in category_ids),
+        )
+        cache.delete_many([
+            NEXT_VISIBILITY_CHANGE_KEY,
+            post_count_cache_key('index'),
+            *(post_count_cache_key('category', pk) for pk in category_ids),
+            *(
+                post_count_cache_key('profile', pk, is_author)
+                for pk in author_ids for is_author in (True, False)
+            ),
+        ])
+
+    def set_published(self, pks, is_published):
+        posts = Post.objects.filter(pk__in=pks)
+        posts.update(
+            is_published=is_published,
+            is_visible=False,
+            updated_at=now(),
+        )
+        if is_published:
+            posts.filter(category__is_published=True).update(is_visible=True)
+        self._invalidate(pks)
+        recount_author_stats(set(posts.values_list('author_id', flat=True)))
+
+    def delete(self, pks):
+        posts = list(
+            Post.objects.filter(pk__in=pks)
+            .values_list('category_id', 'author_id')
+        )
+        comments = Comment.objects.filter(post_id__in=pks)
+        author_ids = set(comments.values_list('author_id', flat=True))
+        _raw_delete(comments)
+        for model in (SearchTerm, ImageJob):
+            _raw_delete(model.objects.filter(post_id__in=pks))
+        _raw_delete(Post.objects.filter(pk__in=pks))
+        self._invalidate_posts(pks, posts)
+        recount_author_stats(
+            author_ids | {author_id for _, author_id in posts})
+
+
+class CommentModeration(Moderation):
+    model = Comment
+    author_field = 'author__username'
+    category_field = 'post__category__slug'
+    text_fields = ('text',)
+
+    def set_published(self, pks, is_published):
+        # `comment_count` учитывает только опубликованные комментарии.
+        changed = Comment.objects.filter(pk__in=pks).exclude(
+            is_published=is_published)
+        post_ids = Counter(changed.values_list('post_id', flat=True))
+        changed.update(is_published=is_published)
+        sign = 1 if is_published else -1
+        for post_id, count in post_ids.items():
+            change_comment_count(post_id, sign * count)
+
+    def delete(self, pks):
+        comments = Comment.objects.filter(pk__in=pks)
+        deleted = list(
+            comments.values_list('post_id', 'author_id', 'is_published'))
+        _raw_delete(comments)
+        for post_id, count in Counter(
+            post_id for post_id, _, is_published in deleted if is_published
+        ).items():
+            change_comment_count(post_id, -count)
+        recount_author_stats({author_id for _, author_id, _ in deleted})
+
+
+class CategoryModeration(Moderation):
+    model = Category
+    category_field = 'slug'
+    text_fields = ('title', 'description')
+
+    def _invalidate(self, pks):
+        bump_tags(FEED_TAG, *(
+            name for pk in pks
+            for name in (tag('category', pk), tag('category_feed', pk))
+        ))
+        cache.delete_many([
+            NEXT_VISIBILITY_CHANGE_KEY,
+            post_count_cache_key('index'),
+            *(post_count_cache_key('category', pk) for pk in pks),
+        ])
+
+    def set_published(self, pks, is_published):
+        author_ids = sync_category_visibility(pks, is_published)
+        super().set_published(pks, is_published)
+        refresh_authors(author_ids)
+
+    def delete(self, pks):
+        # Как и on_delete=SET_NULL, но одним UPDATE: публикации остаются
+        # без категории и пропадают из лент.
+        posts = Post.objects.filter(category_id__in=pks)
+        author_ids = set(
+            posts.filter(is_visible=True).values_list('author_id', flat=True))
+        posts.update(category=None, is_visible=False, updated_at=now())
+        super().delete(pks)
+        refresh_authors(author_ids)
+
+
+class LocationModeration(Moderation):
+    model = Location
+    text_fields = ('name',)
+
+    def _invalidate(self, pks):
+        bump_tags(*(tag('location', pk) for pk in pks))
+
+    def delete(self, pks):
+        Post.objects.filter(location_id__in=pks).update(
+            location=None, updated_at=now())
+        super().delete(pks)
+
+
+MODERATIONS = {
+    'posts': PostModeration(),
+    'comments': CommentModeration(),
+    'categories': CategoryModeration(),
+    'locations': LocationModeration(),
+}
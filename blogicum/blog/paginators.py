@@ -0,0 +1,300 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator)
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.utils import feed_cache_timeout
+from constants import (
+    POSTS_COUNT_CACHE_TIMEOUT, POSTS_COUNT_ESTIMATE_THRESHOLD,
+    POSTS_COUNT_MODE)
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор повреждён или не соответствует сортировке пагинатора."""
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return ''
+        return self.paginator.encode_cursor(
+            self.object_list[-1], self.paginator.NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return ''
+        return self.paginator.encode_cursor(
+            self.object_list[0], self.paginator.PREVIOUS)
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация.
+
+    Вместо OFFSET страница выбирается условием по ключу сортировки
+    последней показанной записи, поэтому время выборки не зависит
+    от глубины страницы.
+
+    Аргументы:
+        queryset: запрос к БД, который нужно разбить на страницы.
+        per_page: количество объектов на странице.
+        ordering: поля сортировки; последнее поле должно быть уникальным.
+    """
+
+    keyset = True
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def page(self, cursor=None):
+        """Возвращает страницу, следующую за курсором (или первую)."""
+        if not cursor:
+            direction, values = self.NEXT, None
+        else:
+            direction, values = self.decode_cursor(cursor)
+
+        ordering = self.ordering
+        queryset = self.queryset
+        if direction == self.PREVIOUS:
+            ordering = tuple(self._reverse(name) for name in ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, direction))
+
+        object_list = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            object_list.reverse()
+            return KeysetPage(object_list, self, True, has_more)
+        return KeysetPage(object_list, self, has_more, values is not None)
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._serialize(getattr(obj, name)) for name in self.fields
+        ]
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, TypeError, ValueError):
+            raise InvalidCursor(cursor)
+
+        if (
+            direction not in (self.NEXT, self.PREVIOUS)
+            or not isinstance(raw_values, list)
+            or len(raw_values) != len(self.fields)
+        ):
+            raise InvalidCursor(cursor)
+
+        # Значения ключа — только строки и числа в пределах BIGINT:
+        # вложенные списки, объекты и null из подделанного курсора
+        # в фильтр не попадают.
+        if not all(
+            isinstance(value, (str, float))
+            or isinstance(value, int) and -2 ** 63 <= value < 2 ** 63
+            for value in raw_values
+        ):
+            raise InvalidCursor(cursor)
+        opts = self.queryset.model._meta
+        try:
+            values = [
+                opts.get_field(name).clean(value, None)
+                for name, value in zip(self.fields, raw_values)
+            ]
+        except (ValidationError, TypeError, ValueError, OverflowError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _seek_filter(self, values, direction):
+        """
+        Условие «строго после курсора» для составного ключа сортировки.
+
+        Для ключа (a, b) по убыванию это `a < x OR (a = x AND b < y)`.
+        """
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            descending = name.startswith('-')
+            if direction == self.PREVIOUS:
+                descending = not descending
+            lookup = 'lt' if descending else 'gt'
+            equal = {
+                self.fields[i]: values[i] for i in range(position)
+            }
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[position]})
+        return condition
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+
+class HasMorePage(Page):
+    """Страница без общего количества объектов."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class PostPaginator(Paginator):
+    """
+    Пагинатор с дешёвым подсчётом количества объектов.
+
+    Количество считается по облегчённому запросу `count_queryset`
+    (без аннотаций и подгрузки связанных моделей) и кэшируется
+    по ключу `cache_key`.
+
+    Режимы подсчёта `count_mode`:
+        exact: точный COUNT.
+        estimated: оценка планировщика PostgreSQL, если она больше
+            POSTS_COUNT_ESTIMATE_THRESHOLD; иначе точный COUNT.
+        has_more: количество не считается, следующая страница
+            определяется выборкой на один объект больше.
+    """
+
+    EXACT = 'exact'
+    ESTIMATED = 'estimated'
+    HAS_MORE = 'has_more'
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        orphans=0,
+        allow_empty_first_page=True,
+        count_queryset=None,
+        cache_key=None,
+        count_mode=POSTS_COUNT_MODE,
+    ):
+        super().__init__(
+            object_list, per_page, orphans, allow_empty_first_page)
+        self.count_queryset = count_queryset
+        self.cache_key = cache_key
+        self.count_mode = count_mode
+
+    def validate_number(self, number):
+        if self.count_mode != self.HAS_MORE:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_mode == self.HAS_MORE:
+            object_list = list(
+                self.object_list[bottom:bottom + self.per_page + 1])
+            if not object_list and number > 1:
+                raise EmptyPage('На этой странице нет результатов')
+            return HasMorePage(
+                object_list[:self.per_page],
+                number,
+                self,
+                len(object_list) > self.per_page,
+            )
+        # Срез не ограничивается `count`: закэшированное количество
+        # может отставать, а LIMIT по размеру страницы ничего не стоит.
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self)
+
+    @cached_property
+    def count(self):
+        if self.count_mode == self.HAS_MORE:
+            return None
+        if self.cache_key is None:
+            return self._count()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self._count()
+            cache.set(
+                self.cache_key,
+                count,
+                feed_cache_timeout(POSTS_COUNT_CACHE_TIMEOUT),
+            )
+        return count
+
+    def _count(self):
+        queryset = self.count_queryset
+        if queryset is None:
+            return super().count
+        if self.count_mode == self.ESTIMATED:
+            estimate = self._estimate(queryset)
+            if estimate and estimate > POSTS_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return queryset.count()
+
+    @staticmethod
+    def _estimate(queryset):
+        """Оценка количества строк по плану запроса PostgreSQL."""
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
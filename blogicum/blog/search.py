@@ -0,0 +1,70 @@
+import re
+from collections import Counter
+
+import snowballstemmer
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from blog.models import SearchTerm
+from constants import (
+    SEARCH_MAX_TERMS, SEARCH_TERM_LENGTH, SEARCH_TITLE_WEIGHT)
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-яё]')
+_russian = snowballstemmer.stemmer('russian')
+_english = snowballstemmer.stemmer('english')
+
+
+def stems(text):
+    """Основы слов текста в порядке появления, с повторами."""
+    words = [
+        word for word in WORD_RE.findall(text.lower().replace('ё', 'е'))
+        if len(word) > 1 and not word.isdigit()
+    ]
+    return [
+        stem[:SEARCH_TERM_LENGTH]
+        for stem in (
+            (_russian if CYRILLIC_RE.search(word) else _english).stemWord(
+                word)
+            for word in words
+        )
+    ]
+
+
+def post_terms(title, text):
+    """Веса основ слов публикации: слово из заголовка весит больше."""
+    weights = Counter(stems(text))
+    for stem in stems(title):
+        weights[stem] += SEARCH_TITLE_WEIGHT
+    return weights
+
+
+def index_post(post):
+    """Перестраивает записи индекса одной публикации."""
+    with transaction.atomic():
+        SearchTerm.objects.filter(post=post).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, post=post, weight=weight)
+            for term, weight in post_terms(post.title, post.text).items()
+        )
+
+
+def search_posts(queryset, query):
+    """
+    Публикации из `queryset`, содержащие все слова запроса.
+
+    Результаты упорядочены по сумме весов найденных слов (`search_rank`),
+    затем от новых к старым.
+    """
+    terms = list(dict.fromkeys(stems(query)))[:SEARCH_MAX_TERMS]
+    if not terms:
+        return queryset.none()
+    return (
+        queryset.filter(search_terms__term__in=terms)
+        .annotate(
+            search_rank=Sum('search_terms__weight'),
+            matched_terms=Count('search_terms'),
+        )
+        .filter(matched_terms=len(terms))
+        .order_by('-search_rank', '-pub_date', '-id')
+    )
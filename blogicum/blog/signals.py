@@ -0,0 +1,322 @@
+from threading import local
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from blog.cache import FEED_TAG, bump_tags, tag
+from blog.models import Category, Comment, ImageJob, Location, Post, User
+from blog.search import index_post
+from blog.stats import (
+    change_author_stats, recount_author_stats, refresh_authors)
+from blog.utils import (
+    NEXT_VISIBILITY_CHANGE_KEY, change_comment_count, compute_post_visibility,
+    post_count_cache_key, sync_category_visibility, visibility_cutoff)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    """Запоминает прежние поля публикации, от которых зависят кэш и индексы."""
+    previous = None
+    if instance.pk is not None:
+        previous = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list(
+                'author_id', 'is_visible', 'pub_date', 'category_id',
+                'image', 'title', 'text',
+            )
+            .first()
+        )
+    (
+        instance._previous_author_id,
+        instance._previous_is_visible,
+        instance._previous_pub_date,
+        instance._previous_category_id,
+        instance._previous_image,
+        *instance._previous_search_text,
+    ) = previous or (None,) * 7
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, **kwargs):
+    """Вычисляет `is_visible` перед сохранением публикации."""
+    instance.is_visible = compute_post_visibility(instance)
+
+
+@receiver(post_save, sender=Post)
+def save_post_visibility(sender, instance, update_fields=None, **kwargs):
+    """Сохраняет `is_visible`, если его не было в `update_fields`."""
+    if (
+        update_fields is not None
+        and 'is_visible' not in update_fields
+        and {'is_published', 'category'} & set(update_fields)
+    ):
+        Post.objects.filter(pk=instance.pk).update(
+            is_visible=instance.is_visible)
+
+
+def _post_category_ids(instance):
+    return {
+        instance.category_id,
+        getattr(instance, '_previous_category_id', None),
+    } - {None}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_counts(sender, instance, **kwargs):
+    """Сбрасывает закэшированное количество публикаций в лентах поста."""
+    cache.delete_many([
+        post_count_cache_key('index'),
+        *(
+            post_count_cache_key('category', category_id)
+            for category_id in _post_category_ids(instance)
+        ),
+        post_count_cache_key('profile', instance.author_id, True),
+        post_count_cache_key('profile', instance.author_id, False),
+    ])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_next_visibility_change(sender, **kwargs):
+    """Сбрасывает момент ближайшей отложенной публикации."""
+    cache.delete(NEXT_VISIBILITY_CHANGE_KEY)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_feeds(sender, instance, **kwargs):
+    """Сбрасывает кэш лент, в которые входит (или входила) публикация."""
+    bump_tags(
+        FEED_TAG,
+        tag('post', instance.pk),
+        *(
+            tag('category_feed', category_id)
+            for category_id in _post_category_ids(instance)
+        ),
+    )
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_job(sender, instance, **kwargs):
+    """Ставит новое фото публикации в очередь на обработку."""
+    if instance.image and instance.image.name != instance._previous_image:
+        ImageJob.objects.create(post=instance, image=instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    """Переиндексирует публикацию; записи удалённой удаляются каскадом."""
+    if [instance.title, instance.text] != instance._previous_search_text:
+        index_post(instance)
+
+
+def _is_public(is_visible, pub_date):
+    # Как в лентах: отложенная публикация ещё не видна посетителям.
+    return bool(
+        is_visible and pub_date is not None
+        and pub_date < visibility_cutoff()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_author_stats(sender, instance, created, **kwargs):
+    """Обновляет статистику автора новой или изменённой публикации."""
+    public = _is_public(instance.is_visible, instance.pub_date)
+    if created:
+        change_author_stats(
+            instance.author_id,
+            refresh_last_post=public,
+            post_count=1,
+            visible_post_count=int(public),
+        )
+    elif instance.author_id != instance._previous_author_id:
+        recount_author_stats(
+            [instance.author_id, instance._previous_author_id])
+    else:
+        was_public = _is_public(
+            instance._previous_is_visible, instance._previous_pub_date)
+        change_author_stats(
+            instance.author_id,
+            refresh_last_post=public != was_public or (
+                public and instance.pub_date != instance._previous_pub_date),
+            visible_post_count=public - was_public,
+        )
+
+
+@receiver(post_delete, sender=Post)
+def reduce_post_author_stats(sender, instance, **kwargs):
+    if instance.author_id in _cascade.users:
+        return
+    public = _is_public(instance.is_visible, instance.pub_date)
+    change_author_stats(
+        instance.author_id,
+        create=False,
+        refresh_last_post=public,
+        post_count=-1,
+        visible_post_count=-int(public),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_author_stats(sender, instance, created, **kwargs):
+    if created:
+        change_author_stats(instance.author_id, comment_count=1)
+
+
+class _CascadeDeletion(local):
+    def __init__(self):
+        self.posts = set()
+        self.users = set()
+
+
+# Публикации и пользователи, которые удаляются прямо сейчас. Их
+# комментарии удаляются каскадом: счётчики исправляются в pre_delete
+# одним UPDATE на публикацию и автора, а построчные обработчики
+# комментариев их пропускают.
+_cascade = _CascadeDeletion()
+
+
+def _in_cascade(comment):
+    return (
+        comment.post_id in _cascade.posts
+        or comment.author_id in _cascade.users
+    )
+
+
+def _comment_totals(comments, field):
+    return (
+        comments.order_by().values_list(field).annotate(total=Count('pk'))
+    )
+
+
+@receiver(pre_delete, sender=Comment)
+def forget_cancelled_cascade(sender, instance, **kwargs):
+    """
+    Снимает отметки каскада, оставшиеся от отменённого удаления.
+
+    В каскаде комментарии обрабатываются раньше своих публикаций
+    и авторов, поэтому отметки текущего удаления появятся позже.
+    """
+    _cascade.posts.discard(instance.post_id)
+    _cascade.users.discard(instance.author_id)
+
+
+@receiver(pre_delete, sender=Post)
+def discount_post_comments(sender, instance, **kwargs):
+    """Вычитает комментарии удаляемой публикации из статистики авторов."""
+    _cascade.posts.add(instance.pk)
+    for author_id, total in _comment_totals(
+            instance.comments.all(), 'author_id'):
+        change_author_stats(author_id, create=False, comment_count=-total)
+
+
+@receiver(pre_delete, sender=User)
+def discount_user_comments(sender, instance, **kwargs):
+    """Вычитает комментарии удаляемого пользователя из чужих публикаций."""
+    _cascade.users.add(instance.pk)
+    comments = Comment.objects.filter(
+        author=instance, is_published=True).exclude(post__author=instance)
+    for post_id, total in _comment_totals(comments, 'post_id'):
+        change_comment_count(post_id, -total)
+
+
+@receiver(post_delete, sender=Post)
+def finish_post_cascade(sender, instance, **kwargs):
+    _cascade.posts.discard(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def finish_user_cascade(sender, instance, **kwargs):
+    _cascade.users.discard(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def reduce_comment_author_stats(sender, instance, **kwargs):
+    if not _in_cascade(instance):
+        change_author_stats(
+            instance.author_id, create=False, comment_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает `comment_count` публикации нового комментария."""
+    if created and instance.is_published:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def reduce_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает `comment_count` публикации удалённого комментария.
+
+    Каскадное удаление вместе с публикацией или автором учитывается
+    заранее, в discount_user_comments().
+    """
+    if instance.is_published and not _in_cascade(instance):
+        change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_post(sender, instance, **kwargs):
+    """Сбрасывает кэш страницы публикации при изменении комментария."""
+    if kwargs['signal'] is post_delete and _in_cascade(instance):
+        return
+    bump_tags(tag('post', instance.post_id))
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, **kwargs):
+    """
+    Отмечает время изменения публикации при правке комментария.
+
+    Добавление и удаление комментариев отмечает change_comment_count().
+    """
+    if not created:
+        Post.objects.filter(pk=instance.post_id).update(updated_at=now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category(sender, instance, **kwargs):
+    """Категория влияет и на свои публикации, и на состав главной ленты."""
+    bump_tags(FEED_TAG, tag('category', instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def sync_category_posts(sender, instance, **kwargs):
+    """Снятие категории с публикации скрывает её публикации, и наоборот."""
+    refresh_authors(
+        sync_category_visibility([instance.pk], instance.is_published))
+    cache.delete_many([
+        post_count_cache_key('index'),
+        post_count_cache_key('category', instance.pk),
+    ])
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Публикации удаляемой категории остаются без категории и скрываются."""
+    refresh_authors(sync_category_visibility([instance.pk], False))
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_location(sender, instance, **kwargs):
+    bump_tags(tag('location', instance.pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user(sender, instance, update_fields=None, **kwargs):
+    # Вход в систему обновляет только last_login — на страницах он не виден.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_tags(tag('user', instance.pk))
@@ -0,0 +1,157 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Greatest
+from django.utils.timezone import now
+
+from blog.models import AuthorStats, Comment, Post, User
+from blog.utils import post_count_cache_key, visibility_cutoff
+from constants import AUTHOR_STATS_BATCH_SIZE
+
+# Статистика автора без публикаций и комментариев.
+EMPTY_STATS = {
+    'post_count': 0,
+    'visible_post_count': 0,
+    'comment_count': 0,
+    'last_post_at': None,
+}
+
+
+def public_posts_filter():
+    """Публикации, которые сейчас видны в лентах всем посетителям."""
+    return Q(is_visible=True, pub_date__lt=visibility_cutoff())
+
+
+def author_stats_values(user_ids):
+    """Счётчики авторов, посчитанные по публикациям и комментариям."""
+    values = {pk: dict(EMPTY_STATS) for pk in user_ids}
+    public = public_posts_filter()
+    posts = (
+        Post.objects.filter(author_id__in=user_ids)
+        .order_by()
+        .values('author_id')
+        .annotate(
+            total=Count('pk'),
+            visible=Count('pk', filter=public),
+            last=Max('pub_date', filter=public),
+        )
+    )
+    for row in posts:
+        values[row['author_id']].update(
+            post_count=row['total'],
+            visible_post_count=row['visible'],
+            last_post_at=row['last'],
+        )
+    comments = (
+        Comment.objects.filter(author_id__in=user_ids)
+        .order_by()
+        .values('author_id')
+        .annotate(total=Count('pk'))
+        .values_list('author_id', 'total')
+    )
+    for author_id, total in comments:
+        values[author_id]['comment_count'] = total
+    return values
+
+
+def stale_author_stats(user_ids):
+    """
+    Статистика авторов, которая расходится с данными.
+
+    Возвращает несохранённые объекты с верными значениями. Авторы без
+    публикаций и комментариев без записи статистики не считаются
+    расхождением: профиль показывает для них нули.
+    """
+    actual = author_stats_values(user_ids)
+    stored = {
+        stats.user_id: stats
+        for stats in AuthorStats.objects.filter(user_id__in=user_ids)
+    }
+    return [
+        AuthorStats(user_id=pk, **values)
+        for pk, values in actual.items()
+        if (
+            any(getattr(stored[pk], name) != values[name]
+                for name in EMPTY_STATS)
+            if pk in stored else values != EMPTY_STATS
+        )
+    ]
+
+
+def save_author_stats(stats):
+    """Сохраняет пересчитанную статистику: обновляет или создаёт записи."""
+    existing = set(
+        AuthorStats.objects.filter(
+            user_id__in=[item.user_id for item in stats]
+        ).values_list('user_id', flat=True)
+    )
+    for item in stats:
+        item.updated_at = now()
+    AuthorStats.objects.bulk_update(
+        [item for item in stats if item.user_id in existing],
+        [*EMPTY_STATS, 'updated_at'],
+    )
+    # Запись могла появиться параллельно: её исправит следующий пересчёт.
+    AuthorStats.objects.bulk_create(
+        [item for item in stats if item.user_id not in existing],
+        ignore_conflicts=True,
+    )
+
+
+def recount_author_stats(user_ids):
+    """Пересчитывает статистику существующих авторов пачками."""
+    user_ids = sorted(
+        User.objects.filter(pk__in={pk for pk in user_ids if pk is not None})
+        .values_list('pk', flat=True)
+    )
+    for start in range(0, len(user_ids), AUTHOR_STATS_BATCH_SIZE):
+        stale = stale_author_stats(
+            user_ids[start:start + AUTHOR_STATS_BATCH_SIZE])
+        if stale:
+            save_author_stats(stale)
+
+
+def refresh_authors(user_ids):
+    """
+    Пересчитывает статистику авторов после массовой смены видимости.
+
+    Вместе со статистикой сбрасывает кэш числа публикаций в их профилях:
+    иначе посетители видят старое число до истечения таймаута.
+    """
+    user_ids = set(user_ids) - {None}
+    recount_author_stats(user_ids)
+    cache.delete_many([
+        post_count_cache_key('profile', pk, is_author)
+        for pk in user_ids for is_author in (True, False)
+    ])
+
+
+def change_author_stats(
+    user_id, create=True, refresh_last_post=False, **deltas
+):
+    """
+    Атомарно прибавляет `deltas` к счётчикам автора.
+
+    С `refresh_last_post` дата последней видимой публикации
+    пересчитывается подзапросом в том же UPDATE. Если записи статистики
+    ещё нет, при `create` она создаётся полным пересчётом. При удалении
+    объектов `create` выключается: удаление может быть частью удаления
+    самого пользователя.
+    """
+    updates = {
+        # Счётчики не уходят в минус, даже если разошлись с данными.
+        name: Greatest(F(name) + delta, Value(0))
+        for name, delta in deltas.items() if delta
+    }
+    if refresh_last_post:
+        updates['last_post_at'] = Subquery(
+            Post.objects.filter(
+                public_posts_filter(), author_id=OuterRef('user_id'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1]
+        )
+    if not updates:
+        return
+    updated = AuthorStats.objects.filter(user_id=user_id).update(
+        updated_at=now(), **updates)
+    if not updated and create:
+        recount_author_stats([user_id])
@@ -0,0 +1,55 @@
+from django import template
+from django.http import QueryDict
+
+from blog.cache import attach_card_versions
+from blog.images import picture_sources
+from blog.utils import category_directory
+
+# GET-параметры, которые ссылки пагинатора переносят на другие страницы.
+PAGINATOR_KEPT_PARAMS = ('q',)
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия кэша карточки публикации."""
+    if not hasattr(post, 'card_version'):
+        attach_card_versions([post])
+    return post.card_version
+
+
+@register.inclusion_tag('includes/picture.html')
+def post_picture(post, size='card'):
+    """Изображение публикации уменьшенного размера в WebP и JPEG."""
+    *sources, fallback = picture_sources(post.image, size)
+    return {
+        'post': post,
+        'sources': sources,
+        'fallback': fallback,
+        # В ленте картинки ниже первого экрана грузятся по мере прокрутки.
+        'lazy': size == 'card',
+    }
+
+
+@register.inclusion_tag('includes/category_sidebar.html')
+def category_sidebar():
+    """Боковая панель категорий; без запросов к БД, пока кэш не сброшен."""
+    return {'categories': category_directory()}
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **params):
+    """
+    Строка запроса для ссылки пагинатора.
+
+    Из текущего запроса сохраняются только PAGINATOR_KEPT_PARAMS
+    (например, поисковый запрос), остальное задаётся аргументами.
+    """
+    query = QueryDict(mutable=True)
+    for name in PAGINATOR_KEPT_PARAMS:
+        if name in context['request'].GET:
+            query[name] = context['request'].GET[name]
+    for name, value in params.items():
+        query[name] = value
+    return f'?{query.urlencode()}'
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from blog import views
+from blog import feeds, views
 
 app_name = 'blog'
 
@@ -10,6 +10,11 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -54,5 +59,33 @@ urlpatterns = [
         views.ProfileListView.as_view(),
         name='profile'
     ),
+    path('search/', views.SearchListView.as_view(), name='search'),
+    path('feed/rss/', feeds.PostsFeed(), name='feed_rss'),
+    path('feed/atom/', feeds.PostsAtomFeed(), name='feed_atom'),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryPostsFeed(),
+        name='category_rss'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.CategoryPostsAtomFeed(),
+        name='category_atom'
+    ),
+    path(
+        'profile/<str:user_name>/rss/',
+        feeds.ProfilePostsFeed(),
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:user_name>/atom/',
+        feeds.ProfilePostsAtomFeed(),
+        name='profile_atom'
+    ),
+    path(
+        'export/<slug:kind>.<slug:export_format>',
+        views.ExportView.as_view(),
+        name='export'
+    ),
     path('', views.IndexListView.as_view(), name='index'),
 ]
@@ -1,14 +1,74 @@
-from django.db.models import Count
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Min, Q
 from django.utils.timezone import now
 
-from blog.models import Post
+from blog.cache import FEED_TAG, bump_tags, get_tag_versions, tag
+from blog.models import Category, Post
+from constants import (
+    CATEGORY_DIRECTORY_CACHE_TIMEOUT, VISIBILITY_BUCKET_SECONDS)
+
+NEXT_VISIBILITY_CHANGE_KEY = 'next_visibility_change'
+CATEGORY_DIRECTORY_KEY = 'category_directory'
+
+
+def visibility_cutoff(moment=None):
+    """
+    Текущее время, округлённое вниз до VISIBILITY_BUCKET_SECONDS.
+
+    Публикация видна, если её `pub_date` меньше этой отметки, поэтому
+    отложенная публикация появляется с задержкой не больше одного шага.
+    """
+    timestamp = (moment or now()).timestamp()
+    bucket = timestamp - timestamp % VISIBILITY_BUCKET_SECONDS
+    return datetime.fromtimestamp(bucket, tz=timezone.utc)
+
+
+def visible_since(pub_date):
+    """Момент, начиная с которого публикация попадает в ленты."""
+    return visibility_cutoff(pub_date) + timedelta(
+        seconds=VISIBILITY_BUCKET_SECONDS)
+
+
+def next_visibility_change():
+    """
+    Ближайший момент, когда отложенная публикация появится в лентах.
+
+    Результат кэшируется до этого момента и сбрасывается сигналами
+    при изменении публикаций и категорий. None — если ждать нечего.
+    """
+    timestamp = cache.get(NEXT_VISIBILITY_CHANGE_KEY)
+    if timestamp is None:
+        pub_date = Post.objects.filter(
+            is_visible=True,
+            pub_date__gte=visibility_cutoff(),
+        ).aggregate(next=Min('pub_date'))['next']
+        timestamp = visible_since(pub_date).timestamp() if pub_date else 0
+        timeout = None
+        if timestamp:
+            timeout = max(1, math.ceil(timestamp - now().timestamp()))
+        cache.set(NEXT_VISIBILITY_CHANGE_KEY, timestamp, timeout)
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def feed_cache_timeout(timeout):
+    """Время жизни кэша ленты: не дольше ближайшей смены видимости."""
+    change = next_visibility_change()
+    if change is None:
+        return timeout
+    seconds = max(1, math.ceil((change - now()).total_seconds()))
+    return min(timeout, seconds)
 
 
 def get_post_info(
     post_model=Post.objects,
     apply_default_filters=True,
     order_by_pub_date=True,
-    annotate_comments=True
+    join_related=True
 ):
     """
     Возвращает запрос к БД для Post модели.
@@ -16,41 +76,164 @@ def get_post_info(
     Аргументы:
         post_model: класс модели поста.
         apply_default_filters: фильтры опубликованной модели при True.
-        order_by_pub_date: Отсортировать по `-pub_date` при True.
-        annotate_comments: аннотация `comment_count` если True.
+        order_by_pub_date: Отсортировать по `-pub_date, -id` при True.
+        join_related: подгрузить категорию, локацию и автора при True.
     """
-    queryset = post_model.select_related(
-        'category', 'location', 'author')
+    queryset = post_model.all()
+
+    if join_related:
+        queryset = queryset.select_related('category', 'location', 'author')
 
     if apply_default_filters:
         queryset = queryset.filter(
-            is_published=True,
-            pub_date__lt=now(),
-            category__is_published=True
+            is_visible=True,
+            pub_date__lt=visibility_cutoff(),
         )
 
     if order_by_pub_date:
-        queryset = queryset.order_by('-pub_date')
-
-    if annotate_comments:
-        queryset = queryset.annotate(comment_count=Count('comments'))
+        queryset = queryset.order_by('-pub_date', '-id')
 
     return queryset
 
 
-def detailed_post_permission(self):
+def get_post_count_queryset(post_model=Post.objects, **kwargs):
+    """
+    Облегчённый запрос для подсчёта публикаций ленты.
+
+    Те же фильтры, что и в `get_post_info`, но без сортировки
+    и подгрузки связанных моделей.
+    """
+    return get_post_info(
+        post_model,
+        order_by_pub_date=False,
+        join_related=False,
+        **kwargs
+    )
+
+
+def post_count_cache_key(*parts):
+    """Ключ кэша количества публикаций для набора фильтров ленты."""
+    return ':'.join(['post_count', *map(str, parts)])
+
+
+def category_directory():
+    """
+    Опубликованные категории с числом видимых публикаций и датой последней.
+
+    Считается одним запросом с группировкой и кэшируется вместе с версией
+    тега FEED_TAG, который сигналы сбрасывают при изменении публикаций
+    и категорий. Тот же запрос находит ближайшую отложенную публикацию:
+    кэш живёт не дольше, чем до её появления в лентах.
+    """
+    versions = get_tag_versions([FEED_TAG])
+    entry = cache.get(CATEGORY_DIRECTORY_KEY)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    cutoff = visibility_cutoff()
+    categories = list(
+        Category.objects.filter(is_published=True)
+        .annotate(
+            post_count=Count('posts', filter=Q(
+                posts__is_visible=True, posts__pub_date__lt=cutoff)),
+            last_pub_date=Max('posts__pub_date', filter=Q(
+                posts__is_visible=True, posts__pub_date__lt=cutoff)),
+            next_pub_date=Min('posts__pub_date', filter=Q(
+                posts__is_visible=True, posts__pub_date__gte=cutoff)),
+        )
+        .order_by('title', 'pk')
+        .values(
+            'slug', 'title', 'post_count', 'last_pub_date', 'next_pub_date')
+    )
+    timeout = CATEGORY_DIRECTORY_CACHE_TIMEOUT
+    scheduled = [
+        category['next_pub_date'] for category in categories
+        if category['next_pub_date'] is not None
+    ]
+    if scheduled:
+        seconds = (visible_since(min(scheduled)) - now()).total_seconds()
+        timeout = max(1, min(timeout, math.ceil(seconds)))
+    cache.set(CATEGORY_DIRECTORY_KEY, (versions, categories), timeout)
+    return categories
+
+
+def change_comment_count(post_id, delta):
+    """Атомарно изменяет счётчик комментариев публикации на `delta`."""
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta,
+        updated_at=now(),
+    )
+    bump_tags(tag('post', post_id))
+
+
+def visible_comments(comments, user):
+    """Комментарии, видимые пользователю: опубликованные и его собственные."""
+    if user.is_authenticated:
+        return comments.filter(Q(is_published=True) | Q(author=user))
+    return comments.filter(is_published=True)
+
+
+def detailed_post_permission(post, user):
     """
     Функция определения доступа к странице публикации.
 
     Доступ разрешен либо автору, либо всем остальным пользователям при условии
     опубликованной модели (PublishableModel).
+
+    Аргументы:
+        post: публикация.
+        user: пользователь, запрашивающий страницу.
     """
     permission = (
-        (self.request.user == self.get_object().author
+        (post.author_id == user.pk
          ) or (
-            (self.get_object().is_published)
-            and (self.get_object().category.is_published)
-            and (self.get_object().pub_date <= now())
+            post.is_visible
+            and post.pub_date < visibility_cutoff()
         )
     )
     return permission
+
+
+def compute_post_visibility(post):
+    """
+    Значение `is_visible`: публикация и её категория опубликованы.
+
+    Категория берётся из уже загруженного объекта, если он есть.
+    """
+    if not post.is_published or post.category_id is None:
+        return False
+    category = Post.category.field.get_cached_value(post, None)
+    if category is not None and category.pk == post.category_id:
+        return category.is_published
+    return Category.objects.filter(
+        pk=post.category_id, is_published=True).exists()
+
+
+def sync_category_visibility(category_ids, is_published):
+    """
+    Пересчитывает `is_visible` публикаций категорий одним UPDATE.
+
+    Возвращает авторов публикаций, сменивших видимость: их статистику
+    нужно пересчитать.
+    """
+    posts = Post.objects.filter(category_id__in=category_ids)
+    if is_published:
+        stale = posts.filter(is_published=True, is_visible=False)
+    else:
+        stale = posts.filter(is_visible=True)
+    author_ids = set(stale.values_list('author_id', flat=True))
+    if author_ids:
+        stale.update(is_visible=is_published)
+    return author_ids
+
+
+def stale_visibility_querysets():
+    """
+    Публикации с неверным `is_visible`.
+
+    Возвращает пару: скрытые, которые должны быть видны, и наоборот.
+    """
+    visible = Q(is_published=True, category__is_published=True)
+    return (
+        Post.objects.filter(visible, is_visible=False),
+        Post.objects.filter(~visible, is_visible=True),
+    )
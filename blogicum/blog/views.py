@@ -1,19 +1,28 @@
-from django.contrib.auth.mixins import (
-    LoginRequiredMixin, PermissionRequiredMixin)
-from django.http import Http404
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView)
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View)
 
+from blog.cache import FEED_TAG, post_tags, tag
+from blog.export import EXPORT_FORMATS, EXPORTS, export_lines
 from blog.forms import CommentForm, PostForm, UserUpdateForm
-from blog.mixins import OnlyAuthorMixin
+from blog.mixins import (
+    AnonymousPageCacheMixin, CommentsPaginationMixin, ConditionalGetMixin,
+    KeysetPaginationMixin, OnlyAuthorMixin, PostCardCacheMixin,
+    PostCountPaginationMixin, PostVisibilityMixin)
 from blog.models import Category, Comment, Post, User
-from blog.utils import detailed_post_permission, get_post_info
+from blog.search import search_posts
+from blog.utils import (
+    get_post_count_queryset, get_post_info, post_count_cache_key)
 from constants import QNT_POSTS_ON_MAIN
 
 
-class IndexListView(ListView):
+class IndexListView(
+    AnonymousPageCacheMixin, KeysetPaginationMixin, PostCountPaginationMixin,
+    PostCardCacheMixin, ListView
+):
     """Класс представления главной страницы со списком всех публикаций."""
 
     model = Post
@@ -23,8 +32,48 @@ class IndexListView(ListView):
     def get_queryset(self):
         return get_post_info()
 
+    def get_count_queryset(self):
+        return get_post_count_queryset()
 
-class PostDetailView(PermissionRequiredMixin, DetailView):
+    def get_count_cache_key(self):
+        return post_count_cache_key('index')
+
+    def get_page_cache_tags(self, context):
+        return [FEED_TAG] + [
+            name for post in context['page_obj'] for name in post_tags(post)
+        ]
+
+
+class SearchListView(PostCardCacheMixin, ListView):
+    """Класс представления результатов поиска по публикациям."""
+
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = QNT_POSTS_ON_MAIN
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_posts(
+            get_post_info(order_by_pub_date=False), self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+def post_card_objects(posts):
+    """Объекты, от `updated_at` которых зависят карточки публикаций."""
+    return [
+        obj for post in posts
+        for obj in (post, post.category, post.location)
+    ]
+
+
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostVisibilityMixin,
+    CommentsPaginationMixin, DetailView
+):
     """Класс представления страницы с полным текстом данной публикации."""
 
     model = Post
@@ -32,26 +81,47 @@ class PostDetailView(PermissionRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author').all()
-        )
+        context['form'] = CommentForm(instance=Comment(post=self.object))
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
-    def has_permission(self):
-        flag = detailed_post_permission(self)
-        return flag
+    def get_page_cache_tags(self, context):
+        # FEED_TAG — из-за боковой панели категорий в base.html.
+        return [FEED_TAG] + post_tags(self.object) + [
+            tag('user', comment.author_id) for comment in context['comments']
+        ]
+
+    def get_conditional_objects(self, context):
+        return post_card_objects([self.object])
+
+    def get_conditional_tags(self, context):
+        return self.get_page_cache_tags(context)
+
+
+class CommentListView(
+    PostVisibilityMixin, CommentsPaginationMixin, DetailView
+):
+    """Класс представления очередной порции комментариев к публикации."""
+
+    model = Post
+    template_name = 'includes/comment_list.html'
 
-    def handle_no_permission(self):
-        raise Http404()
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(self.object)
+        return context
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin,
+    PostCountPaginationMixin, PostCardCacheMixin, ListView
+):
     """Класс представления для отображения списка публикаций в категории."""
 
     model = Post
     template_name = 'blog/category.html'
     paginate_by = QNT_POSTS_ON_MAIN
+    conditional_last_modified = False
 
     def get_queryset(self):
         self.current_category = get_object_or_404(
@@ -61,30 +131,79 @@ class CategoryListView(ListView):
         )
         return get_post_info(self.current_category.posts.all())
 
+    def get_count_queryset(self):
+        return get_post_count_queryset(self.current_category.posts.all())
+
+    def get_count_cache_key(self):
+        return post_count_cache_key('category', self.current_category.pk)
+
+    def get_page_cache_tags(self, context):
+        return [
+            FEED_TAG,
+            tag('category_feed', self.current_category.pk),
+            tag('category', self.current_category.pk),
+        ] + [
+            name for post in context['page_obj'] for name in post_tags(post)
+        ]
+
+    def get_conditional_objects(self, context):
+        return [self.current_category] + post_card_objects(
+            context['page_obj'])
+
+    def get_conditional_tags(self, context):
+        return self.get_page_cache_tags(context)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['current_category'] = self.current_category
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ConditionalGetMixin, KeysetPaginationMixin, PostCountPaginationMixin,
+    PostCardCacheMixin, ListView
+):
     """Класс представления страницы профиля."""
 
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = QNT_POSTS_ON_MAIN
+    conditional_last_modified = False
 
     def get_queryset(self):
-        self.user = get_object_or_404(User, username=self.kwargs['user_name'])
+        self.user = get_object_or_404(
+            User.objects.select_related('stats'),
+            username=self.kwargs['user_name'],
+        )
         res = get_post_info(
             self.user.posts.all(),
             apply_default_filters=self.request.user != self.user
         )
         return res
 
+    def get_count_queryset(self):
+        return get_post_count_queryset(
+            self.user.posts.all(),
+            apply_default_filters=self.request.user != self.user
+        )
+
+    def get_count_cache_key(self):
+        return post_count_cache_key(
+            'profile', self.user.pk, self.request.user == self.user)
+
+    def get_conditional_objects(self, context):
+        return [context['stats'], *post_card_objects(context['page_obj'])]
+
+    def get_conditional_tags(self, context):
+        return [FEED_TAG, tag('user', self.user.pk)] + [
+            name for post in context['page_obj'] for name in post_tags(post)
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.user
+        # Записи ещё нет, если пользователь ничего не публиковал.
+        context['stats'] = getattr(self.user, 'stats', None)
         return context
 
 
@@ -133,7 +252,7 @@ class PostUpdateView(LoginRequiredMixin, OnlyAuthorMixin, UpdateView):
     template_name = 'blog/create.html'
 
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.get_object().id})
+        return reverse('blog:post_detail', kwargs={'pk': self.object.pk})
 
 
 class PostDeleteView(LoginRequiredMixin, OnlyAuthorMixin, DeleteView):
@@ -142,12 +261,12 @@ class PostDeleteView(LoginRequiredMixin, OnlyAuthorMixin, DeleteView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
+    # Шаблон показывает локацию удаляемой публикации.
+    related_fields = ('author', 'location')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
-
-        form = PostForm(instance=post)
+        form = PostForm(instance=self.object)
         context['form'] = form
         return context
 
@@ -187,11 +306,12 @@ class CommentUpdateView(LoginRequiredMixin, OnlyAuthorMixin, UpdateView):
     form_class = CommentForm
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
+    related_fields = ('author', 'post')
 
     def get_success_url(self):
         res = reverse(
             'blog:post_detail',
-            kwargs={'pk': self.get_object().post.pk}
+            kwargs={'pk': self.object.post_id}
         )
         return res
 
@@ -203,10 +323,34 @@ class CommentDeleteView(LoginRequiredMixin, OnlyAuthorMixin, DeleteView):
     form_class = CommentForm
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
+    related_fields = ('author', 'post')
 
     def get_success_url(self):
         res = reverse(
             'blog:post_detail',
-            kwargs={'pk': self.get_object().post.pk}
+            kwargs={'pk': self.object.post_id}
         )
         return res
+
+
+class ExportView(UserPassesTestMixin, View):
+    """
+    Потоковая выгрузка публикаций или комментариев для сотрудников.
+
+    Ответ отдаётся по мере чтения строк из БД, целиком в памяти
+    выгрузка не собирается.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, kind, export_format):
+        if kind not in EXPORTS or export_format not in EXPORT_FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export_lines(kind, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{export_format}"')
+        return response
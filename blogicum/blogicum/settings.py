@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -18,6 +19,7 @@ INSTALLED_APPS = [
     'django_bootstrap5',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -62,6 +64,27 @@ DATABASES = {
     }
 }
 
+# Кэш должен быть общим для веб-процессов и команд, которые запускаются
+# отдельно (process_scheduled_posts, process_image_jobs, moderate,
+# bulk_loaddata): они сбрасывают теги кэша из своего процесса. Например:
+#   BLOGICUM_CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+#   BLOGICUM_CACHE_LOCATION=127.0.0.1:11211
+# или DatabaseCache с именем таблицы (создаётся `createcachetable`).
+# Без переменных — LocMemCache в памяти процесса: только для тестов
+# и разработки, `manage.py check --deploy` об этом предупреждает.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('BLOGICUM_CACHE_LOCATION', ''),
+    }
+}
+# Memcached вытесняет записи сам и не принимает MAX_ENTRIES.
+if 'memcached' not in CACHES['default']['BACKEND']:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -9,6 +9,7 @@ from django.views.generic.edit import CreateView
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
+    path('api/', include('api.urls')),
     path(
         'auth/registration/',
         CreateView.as_view(
@@ -1,3 +1,47 @@
 QNT_POSTS_ON_MAIN = 10
 OBJ_NAME_LENGTH = 25
 ADMIN_TEXT_LENGTH = 50
+# Режим пагинации лент публикаций: 'offset' (номера страниц)
+# или 'keyset' (курсор по `pub_date, id`, не зависит от глубины страницы).
+POSTS_PAGINATION_MODE = 'offset'
+# Подсчёт публикаций для пагинатора: 'exact' (COUNT с кэшированием),
+# 'estimated' (оценка планировщика для больших таблиц PostgreSQL)
+# или 'has_more' (без подсчёта, только ссылка на следующую страницу).
+POSTS_COUNT_MODE = 'exact'
+POSTS_COUNT_CACHE_TIMEOUT = 60
+POSTS_COUNT_ESTIMATE_THRESHOLD = 100_000
+QNT_COMMENTS_ON_PAGE = 20
+# Время жизни страниц в кэше для анонимных посетителей, секунды.
+PAGE_CACHE_TIMEOUT = 300
+# Время жизни списка категорий с числом публикаций в боковой панели, секунды.
+CATEGORY_DIRECTORY_CACHE_TIMEOUT = 3600
+# Шаг округления текущего времени в фильтре видимости публикаций, секунды:
+# одинаковые запросы в пределах шага дают одинаковый SQL.
+VISIBILITY_BUCKET_SECONDS = 60
+# Производные изображения публикаций: имя варианта -> ширина, пиксели.
+# Карточка показывает `card` (и `detail` для экранов с плотностью 2x),
+# страница публикации — `detail` (и `retina`).
+POST_IMAGE_VARIANTS = {'card': 640, 'detail': 1280, 'retina': 2560}
+POST_IMAGE_QUALITY = 80
+# Ограничения на загружаемые фото: размер файла и число пикселей.
+POST_IMAGE_MAX_BYTES = 20 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 50_000_000
+# Задача обработки фото, которая висит в статусе «обрабатывается» дольше
+# этого времени (воркер упал), снова выдаётся воркеру, секунды.
+IMAGE_JOB_TIMEOUT = 600
+IMAGE_JOB_MAX_ATTEMPTS = 3
+# Поиск: вес слова из заголовка относительно слова из текста
+# и максимальное число слов запроса, которые учитываются.
+SEARCH_TITLE_WEIGHT = 3
+SEARCH_MAX_TERMS = 10
+SEARCH_TERM_LENGTH = 64
+QNT_FEED_ITEMS = 20
+# Размер страницы JSON API по умолчанию и наибольший через `?limit=`.
+QNT_API_PAGE_SIZE = 20
+QNT_API_MAX_PAGE_SIZE = 100
+# Сколько строк выгрузки читается из БД за раз.
+EXPORT_CHUNK_SIZE = 2000
+# Сколько объектов массовая модерация меняет одним UPDATE или DELETE.
+MODERATION_CHUNK_SIZE = 1000
+# Сколько авторов пересчитывается за раз при пересчёте статистики.
+AUTHOR_STATS_BATCH_SIZE = 500
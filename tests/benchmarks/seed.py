@@ -0,0 +1,91 @@
+"""Наполнение БД большим набором данных для замеров производительности."""
+import os
+import random
+from datetime import timedelta
+from io import StringIO
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from blog.models import Comment, Post
+
+# Множитель размера набора данных: BLOGICUM_BENCH_SCALE=100 даёт
+# 6000 публикаций и 30000 комментариев.
+SCALE = int(os.environ.get("BLOGICUM_BENCH_SCALE", "1"))
+N_USERS = 5 * SCALE
+N_CATEGORIES = 3 + SCALE
+N_LOCATIONS = 5 + SCALE
+N_POSTS = 60 * SCALE
+N_COMMENTS = 300 * SCALE
+BATCH_SIZE = 1000
+
+
+class Dataset(NamedTuple):
+    author: object
+    post: Post
+    comment: Comment
+    category_slug: str
+
+
+def seed() -> Dataset:
+    rnd = random.Random(42)
+    now = timezone.now()
+    users = mixer.cycle(N_USERS).blend(get_user_model())
+    categories = mixer.cycle(N_CATEGORIES).blend(
+        "blog.Category", is_published=True)
+    locations = mixer.cycle(N_LOCATIONS).blend(
+        "blog.Location", is_published=True)
+
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=f"Публикация {i}",
+                text=" ".join(f"слово{rnd.randrange(500)}" for _ in range(60)),
+                pub_date=now - timedelta(minutes=rnd.randrange(1, 10 ** 6)),
+                author=rnd.choice(users),
+                category=rnd.choice(categories),
+                location=rnd.choice(locations + [None]),
+                is_published=rnd.random() > 0.05,
+            )
+            for i in range(N_POSTS)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    post_ids = list(Post.objects.values_list("pk", flat=True))
+    # Большая часть комментариев — у одной «вирусной» публикации.
+    viral_id = post_ids[0]
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                text=f"Комментарий {i}",
+                author=rnd.choice(users),
+                post_id=viral_id if i % 2 else rnd.choice(post_ids),
+            )
+            for i in range(N_COMMENTS)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    call_command("recount_comments", stdout=StringIO())
+    call_command("rebuild_search_index", stdout=StringIO())
+    call_command("refresh_post_visibility", stdout=StringIO())
+    call_command("rebuild_author_stats", stdout=StringIO())
+
+    post = Post.objects.select_related("author", "category").get(
+        pk=viral_id)
+    post.is_published = True
+    post.category.is_published = True
+    post.category.save()
+    post.save()
+    # Автор — сотрудник, чтобы замерять и выгрузку данных.
+    post.author.is_staff = True
+    post.author.save(update_fields=["is_staff"])
+    return Dataset(
+        author=post.author,
+        post=post,
+        comment=post.comments.filter(author=post.author).first()
+        or mixer.blend("blog.Comment", post=post, author=post.author),
+        category_slug=post.category.slug,
+    )
@@ -0,0 +1,241 @@
+"""
+Замеры количества запросов, времени и памяти для всех маршрутов.
+
+По умолчанию проверяется только число запросов: оно не зависит от машины.
+Время и память зависят от железа и нагрузки, поэтому их бюджеты
+проверяются только по запросу.
+
+Переменные окружения:
+    BLOGICUM_BENCH_TIMING: 1 — замерять и проверять время и память.
+    BLOGICUM_BENCH_SCALE: множитель размера набора данных (см. seed.py).
+    BLOGICUM_BENCH_OUTPUT: путь к JSON-файлу с результатами замеров.
+    BLOGICUM_BENCH_UPDATE: 1 — перезаписать budgets.json по замерам;
+        без BLOGICUM_BENCH_TIMING обновляется только число запросов.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from api.urls import urlpatterns as api_urlpatterns
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+from seed import seed
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+REPEAT = int(os.environ.get("BLOGICUM_BENCH_REPEAT", "3"))
+TIMING = os.environ.get("BLOGICUM_BENCH_TIMING") == "1"
+# Запас, с которым BLOGICUM_BENCH_UPDATE записывает время и память.
+HEADROOM = 3
+MIN_TIME_BUDGET_MS = 100
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        try:
+            yield seed()
+        finally:
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+
+
+def _routes(data):
+    """Маршрут -> (url, нужна ли авторизация автора)."""
+    post_id = data.post.id
+    return {
+        "blog:index": (reverse("blog:index"), False),
+        "blog:index?page=2": (reverse("blog:index") + "?page=2", False),
+        "blog:post_detail": (
+            reverse("blog:post_detail", args=[post_id]), False),
+        "blog:comments": (reverse("blog:comments", args=[post_id]), False),
+        "blog:category_posts": (
+            reverse("blog:category_posts", args=[data.category_slug]), False),
+        "blog:profile": (
+            reverse("blog:profile", args=[data.author.username]), False),
+        "blog:profile (author)": (
+            reverse("blog:profile", args=[data.author.username]), True),
+        "blog:create_post": (reverse("blog:create_post"), True),
+        "blog:edit_post": (reverse("blog:edit_post", args=[post_id]), True),
+        "blog:delete_post": (
+            reverse("blog:delete_post", args=[post_id]), True),
+        "blog:add_comment": (
+            reverse("blog:add_comment", args=[post_id]), True),
+        "blog:edit_comment": (
+            reverse("blog:edit_comment", args=[post_id, data.comment.id]),
+            True,
+        ),
+        "blog:delete_comment": (
+            reverse("blog:delete_comment", args=[post_id, data.comment.id]),
+            True,
+        ),
+        "blog:edit_profile": (reverse("blog:edit_profile"), True),
+        "blog:search": (reverse("blog:search") + "?q=публикации+слово1", False),
+        "blog:feed_rss": (reverse("blog:feed_rss"), False),
+        "blog:feed_atom": (reverse("blog:feed_atom"), False),
+        "blog:category_rss": (
+            reverse("blog:category_rss", args=[data.category_slug]), False),
+        "blog:category_atom": (
+            reverse("blog:category_atom", args=[data.category_slug]), False),
+        "blog:profile_rss": (
+            reverse("blog:profile_rss", args=[data.author.username]),
+            False,
+        ),
+        "blog:profile_atom": (
+            reverse("blog:profile_atom", args=[data.author.username]),
+            False,
+        ),
+        "api:posts": (reverse("api:posts"), False),
+        "api:posts?fields=id,title": (
+            reverse("api:posts") + "?fields=id,title", False),
+        "api:post_detail": (
+            reverse("api:post_detail", args=[post_id]), False),
+        "api:comments": (reverse("api:comments", args=[post_id]), False),
+        "api:categories": (reverse("api:categories"), False),
+        "api:category": (
+            reverse("api:category", args=[data.category_slug]), False),
+        "api:category_posts": (
+            reverse("api:category_posts", args=[data.category_slug]), False),
+        "api:profile": (
+            reverse("api:profile", args=[data.author.username]), False),
+        "api:profile_posts": (
+            reverse("api:profile_posts", args=[data.author.username]), False),
+        "blog:export": (
+            reverse("blog:export", args=["posts", "jsonl"]), True),
+        "blog:export (comments csv)": (
+            reverse("blog:export", args=["comments", "csv"]), True),
+        "pages:about": (reverse("pages:about"), False),
+        "pages:rules": (reverse("pages:rules"), False),
+    }
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.streaming:
+        # Запросы потокового ответа выполняются при его чтении.
+        b"".join(response.streaming_content)
+    return response
+
+
+def _measure(client, url):
+    # Замеряем «холодный» путь: без страниц и фрагментов в кэше.
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = _get(client, url)
+    result = {"queries": len(ctx.captured_queries)}
+    if not TIMING:
+        return response.status_code, result
+
+    timings = []
+    for _ in range(REPEAT):
+        cache.clear()
+        start = time.perf_counter()
+        _get(client, url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # tracemalloc замедляет код, поэтому память меряем отдельным проходом.
+    cache.clear()
+    tracemalloc.start()
+    _get(client, url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result["time_ms"] = round(statistics.median(timings), 1)
+    result["memory_kb"] = round(peak / 1024)
+    return response.status_code, result
+
+
+def _update_budgets(budgets, results):
+    updated = {}
+    for name, result in results.items():
+        updated[name] = dict(budgets.get(name, {}), queries=result["queries"])
+        if TIMING:
+            updated[name]["time_ms"] = max(
+                round(result["time_ms"] * HEADROOM), MIN_TIME_BUDGET_MS)
+            updated[name]["memory_kb"] = round(
+                result["memory_kb"] * HEADROOM)
+    BUDGETS_PATH.write_text(
+        json.dumps(updated, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture(scope="module")
+def budgets():
+    return json.loads(BUDGETS_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="module")
+def results(dataset, budgets, django_db_blocker):
+    anonymous, author = Client(), Client()
+    with django_db_blocker.unblock():
+        author.force_login(dataset.author)
+        results = {}
+        for name, (url, as_author) in _routes(dataset).items():
+            status, results[name] = _measure(
+                author if as_author else anonymous, url)
+            assert status == 200, f"Маршрут `{name}` ({url}) вернул {status}."
+
+    output = os.environ.get("BLOGICUM_BENCH_OUTPUT")
+    if output:
+        Path(output).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+    if os.environ.get("BLOGICUM_BENCH_UPDATE") == "1":
+        _update_budgets(budgets, results)
+    return results
+
+
+def _check_budgets(budgets, results, metrics):
+    if os.environ.get("BLOGICUM_BENCH_UPDATE") == "1":
+        return
+    missing = sorted(set(results) - set(budgets))
+    assert not missing, f"Нет бюджета для маршрутов: {missing}"
+    regressions = [
+        f"{name}: {metric} = {result[metric]} > {budgets[name][metric]}"
+        for name, result in results.items()
+        for metric in metrics
+        if result[metric] > budgets[name][metric]
+    ]
+    assert not regressions, (
+        "Маршруты превысили бюджет производительности:\n"
+        + "\n".join(regressions)
+    )
+
+
+def test_every_route_has_benchmark(dataset):
+    covered = {name.split(" ")[0].split("?")[0] for name in _routes(dataset)}
+    for namespace, patterns in (
+            ("blog", blog_urlpatterns),
+            ("pages", pages_urlpatterns),
+            ("api", api_urlpatterns),
+    ):
+        for pattern in patterns:
+            if isinstance(pattern, URLPattern):
+                name = f"{namespace}:{pattern.name}"
+                assert name in covered, (
+                    f"Добавьте маршрут `{name}` в замеры производительности."
+                )
+
+
+def test_routes_query_budget(budgets, results):
+    _check_budgets(budgets, results, ("queries",))
+
+
+@pytest.mark.skipif(
+    not TIMING, reason="Время и память: BLOGICUM_BENCH_TIMING=1.")
+def test_routes_time_and_memory_budget(budgets, results):
+    _check_budgets(budgets, results, ("time_ms", "memory_kb"))
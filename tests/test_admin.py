@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _changelist_queries(client, model_name):
+    url = reverse(f"admin:blog_{model_name}_changelist")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize("model_name", ["post", "comment"])
+def test_changelist_query_count_is_constant(
+        admin_client, mixer, model_name
+):
+    counts = []
+    for n_rows in (2, 40):
+        users = mixer.cycle(3).blend("auth.User")
+        categories = mixer.cycle(3).blend("blog.Category")
+        posts = mixer.cycle(n_rows).blend(
+            "blog.Post",
+            author=mixer.sequence(*users),
+            category=mixer.sequence(*categories),
+        )
+        mixer.cycle(n_rows).blend(
+            "blog.Comment",
+            post=mixer.sequence(*posts),
+            author=mixer.sequence(*users),
+        )
+        counts.append(_changelist_queries(admin_client, model_name))
+    assert counts[0] == counts[1], (
+        f"Убедитесь, что число запросов списка `{model_name}` в админке"
+        f" не зависит от количества строк: {counts}."
+    )
+
+
+def test_comment_filter_does_not_list_posts(admin_client, mixer):
+    posts = mixer.cycle(3).blend("blog.Post", title=mixer.sequence(
+        "Первая публикация", "Вторая публикация", "Третья публикация"))
+    mixer.blend("blog.Comment", post=posts[0])
+    url = reverse("admin:blog_comment_changelist")
+
+    content = admin_client.get(url).content.decode("utf-8")
+    assert "Третья публикация" not in content, (
+        "Убедитесь, что фильтр по публикации не выводит все публикации."
+    )
+    assert 'data-field-name="post"' in content
+    assert "js/autocomplete_filter.js" in content
+
+    response = admin_client.get(url, {"post__id__exact": posts[2].id})
+    assert response.status_code == 200
+    content = response.content.decode("utf-8")
+    assert (
+        f'<option value="{posts[2].id}" selected>Третья публикация</option>'
+        in content
+    ), "Убедитесь, что фильтр показывает выбранную публикацию."
+    assert "Первая публикация" not in content
+    assert response.context["cl"].result_count == 0
+
+
+def test_autocomplete_fields(admin_client, mixer):
+    post = mixer.blend("blog.Post", title="Искомая публикация")
+    response = admin_client.get(
+        reverse("admin:blog_comment_add"))
+    assert response.status_code == 200
+    assert "admin-autocomplete" in response.content.decode("utf-8"), (
+        "Убедитесь, что связи комментария выбираются через autocomplete."
+    )
+    response = admin_client.get(
+        reverse("admin:autocomplete"),
+        {
+            "term": "Искомая",
+            "app_label": "blog",
+            "model_name": "comment",
+            "field_name": "post",
+        },
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == [
+        str(post.id)]
+    for name in ("post_add", "category_changelist", "location_changelist"):
+        assert admin_client.get(
+            reverse(f"admin:blog_{name}")).status_code == 200
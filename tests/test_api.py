@@ -0,0 +1,151 @@
+import base64
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from constants import QNT_API_PAGE_SIZE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(QNT_API_PAGE_SIZE + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hour) for hour in range(1, 100)),
+    )
+
+
+def _get(client, url, status=200, **params):
+    response = client.get(url, params)
+    assert response.status_code == status, (
+        f"Убедитесь, что `{url}` с параметрами {params} отвечает {status}."
+    )
+    assert response["Content-Type"] == "application/json"
+    return json.loads(response.content)
+
+
+def test_posts_cursor_pagination(client, api_posts):
+    data = _get(client, "/api/posts/")
+    assert [post["id"] for post in data["results"]] == [
+        post.id for post in api_posts[:QNT_API_PAGE_SIZE]
+    ], "Убедитесь, что API отдаёт ленту публикаций, новые сверху."
+    assert data["previous"] is None
+
+    second = _get(client, "/api/posts/", cursor=data["next"])
+    assert [post["id"] for post in second["results"]] == [
+        post.id for post in api_posts[QNT_API_PAGE_SIZE:]
+    ], "Убедитесь, что курсор `next` открывает следующую страницу."
+    assert second["next"] is None
+
+    back = _get(client, "/api/posts/", cursor=second["previous"])
+    assert back["results"] == data["results"]
+
+    _get(client, "/api/posts/", status=400, cursor="broken")
+    _get(client, "/api/posts/", status=400, limit=0)
+    assert len(_get(client, "/api/posts/", limit=3)["results"]) == 3
+
+
+def test_posts_respect_visibility(
+        client, user_client, user, api_posts, posts_with_unpublished_category,
+        future_posts
+):
+    hidden = {post.id for post in posts_with_unpublished_category}
+    hidden |= {post.id for post in future_posts}
+    data = _get(client, "/api/posts/", limit=100)
+    assert not hidden & {post["id"] for post in data["results"]}, (
+        "Убедитесь, что API не показывает скрытые и отложенные публикации."
+    )
+
+    url = f"/api/profiles/{user.username}/posts/"
+    anonymous = _get(client, url, limit=100)["results"]
+    own = _get(user_client, url, limit=100)["results"]
+    assert not hidden & {post["id"] for post in anonymous}
+    assert hidden <= {post["id"] for post in own}, (
+        "Убедитесь, что автор видит в API свои скрытые публикации."
+    )
+
+    post_id = next(iter(hidden))
+    _get(client, f"/api/posts/{post_id}/", status=404)
+    _get(client, f"/api/posts/{post_id}/comments/", status=404)
+    _get(user_client, f"/api/posts/{post_id}/")
+
+
+def test_sparse_fieldsets(client, django_assert_num_queries, api_posts):
+    post = api_posts[0]
+    data = _get(client, f"/api/posts/{post.id}/")
+    assert data == {
+        "id": post.id,
+        "title": post.title,
+        "text": post.text,
+        "pub_date": data["pub_date"],
+        "image": post.image.url if post.image else None,
+        "comment_count": 0,
+        "author": post.author.username,
+        "category": {
+            "slug": post.category.slug, "title": post.category.title},
+        "location": post.location.name,
+    }
+
+    with django_assert_num_queries(1) as ctx:
+        data = _get(client, "/api/posts/", fields="id,title")
+    sql = ctx.captured_queries[0]["sql"]
+    assert "JOIN" not in sql and '"text"' not in sql, (
+        "Убедитесь, что API выбирает из БД только запрошенные поля."
+    )
+    assert set(data["results"][0]) == {"id", "title"}
+
+    data = _get(client, f"/api/posts/{post.id}/", fields="author")
+    assert data == {"author": post.author.username}
+    _get(client, "/api/posts/", status=400, fields="id,password")
+
+
+def test_comments_categories_profiles(
+        client, django_assert_num_queries, mixer, user,
+        post_with_published_location, published_category
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    with django_assert_num_queries(2):
+        data = _get(client, f"/api/posts/{post.id}/comments/")
+    assert [comment["id"] for comment in data["results"]] == [
+        comment.id for comment in comments
+    ], "Убедитесь, что API отдаёт комментарии к публикации, старые сверху."
+
+    data = _get(client, "/api/categories/")
+    assert [category["slug"] for category in data["results"]] == [
+        published_category.slug]
+    data = _get(client, f"/api/categories/{published_category.slug}/posts/")
+    assert [post["id"] for post in data["results"]] == [post.id]
+
+    data = _get(client, f"/api/profiles/{user.username}/")
+    assert data["username"] == user.username
+    _get(client, "/api/profiles/nobody/", status=404)
+
+
+def test_compact_gzip_output(client, api_posts):
+    response = client.get("/api/posts/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что ответы API сжимаются, если клиент это поддерживает."
+    )
+    content = gzip.decompress(response.content).decode("utf-8")
+    assert '": ' not in content and "\\u" not in content, (
+        "Убедитесь, что API отдаёт компактный JSON без лишних пробелов."
+    )
+
+
+@pytest.mark.parametrize("value", [["n", [{}, 1]], ["n", [[1], 1]]])
+def test_malformed_cursor(client, api_posts, value):
+    cursor = base64.urlsafe_b64encode(
+        json.dumps(value).encode()).decode().rstrip("=")
+    post = api_posts[0]
+    _get(client, "/api/posts/", status=400, cursor=cursor)
+    _get(client, f"/api/posts/{post.pk}/comments/", status=400, cursor=cursor)
@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import AuthorStats, Post
+from blog.stats import author_stats_values
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stats(user):
+    return AuthorStats.objects.get(user=user)
+
+
+def _assert_actual(*users):
+    actual = author_stats_values([user.pk for user in users])
+    for user in users:
+        stats = AuthorStats.objects.filter(user=user).first()
+        stored = {
+            name: getattr(stats, name, 0 if name != "last_post_at" else None)
+            for name in actual[user.pk]
+        }
+        assert stored == actual[user.pk], (
+            "Убедитесь, что статистика автора совпадает с его публикациями"
+            " и комментариями."
+        )
+
+
+@pytest.fixture
+def author_posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            lambda n: timezone.now() - timedelta(days=n + 1)),
+    )
+
+
+def test_stats_follow_posts_and_comments(mixer, user, another_user,
+                                         author_posts):
+    stats = _stats(user)
+    assert stats.post_count == stats.visible_post_count == 3, (
+        "Убедитесь, что статистика автора обновляется при создании"
+        " публикаций."
+    )
+    assert stats.last_post_at == author_posts[0].pub_date
+
+    post = author_posts[0]
+    post.is_published = False
+    post.save()
+    assert _stats(user).visible_post_count == 2
+    assert _stats(user).last_post_at == author_posts[1].pub_date, (
+        "Убедитесь, что дата последней публикации учитывает только"
+        " публикации, видимые в лентах."
+    )
+
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    assert _stats(another_user).comment_count == 2
+
+    author_posts[1].delete()
+    _assert_actual(user, another_user)
+    assert _stats(user).last_post_at == author_posts[2].pub_date, (
+        "Убедитесь, что после удаления публикации дата последней"
+        " публикации пересчитывается."
+    )
+
+
+def test_scheduled_post_hidden_from_stats(
+        mixer, user, author_posts, published_category
+):
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    stats = _stats(user)
+    assert (stats.post_count, stats.visible_post_count) == (4, 3)
+    assert stats.last_post_at == author_posts[0].pub_date, (
+        "Убедитесь, что статистика не выдаёт посетителям отложенные"
+        " публикации."
+    )
+
+    # Время публикации наступило: команда по расписанию учитывает её.
+    pub_date = timezone.now() - timedelta(seconds=100)
+    Post.objects.filter(pk=scheduled.pk).update(pub_date=pub_date)
+    call_command("process_scheduled_posts", stdout=StringIO())
+    stats = _stats(user)
+    assert (stats.visible_post_count, stats.last_post_at) == (4, pub_date)
+
+
+def test_category_and_author_changes(user, another_user, author_posts,
+                                     published_category):
+    published_category.is_published = False
+    published_category.save()
+    assert _stats(user).visible_post_count == 0, (
+        "Убедитесь, что снятие категории с публикации обновляет"
+        " статистику авторов."
+    )
+
+    post = author_posts[0]
+    post.author = another_user
+    post.save()
+    _assert_actual(user, another_user)
+
+
+def test_moderation_updates_stats(mixer, user, another_user, author_posts):
+    mixer.blend("blog.Comment", post=author_posts[0], author=another_user)
+    call_command(
+        "moderate", "posts", "delete", "--author", user.username,
+        stdout=StringIO(),
+    )
+    assert _stats(user).post_count == 0
+    assert _stats(another_user).comment_count == 0, (
+        "Убедитесь, что массовое удаление публикаций обновляет статистику"
+        " авторов их комментариев."
+    )
+
+
+def test_rebuild_author_stats(user, another_user, author_posts):
+    AuthorStats.objects.filter(user=user).update(
+        post_count=10, comment_count=5)
+    with pytest.raises(CommandError):
+        call_command("rebuild_author_stats", "--check", stdout=StringIO())
+    assert _stats(user).post_count == 10, (
+        "Убедитесь, что с флагом --check статистика не исправляется."
+    )
+
+    out = StringIO()
+    call_command("rebuild_author_stats", "--batch-size", "1", stdout=out)
+    assert "с неверной статистикой: 1" in out.getvalue()
+    _assert_actual(user, another_user)
+    assert not AuthorStats.objects.filter(user=another_user).exists(), (
+        "Убедитесь, что для пользователей без публикаций и комментариев"
+        " запись статистики не создаётся."
+    )
+    call_command("rebuild_author_stats", "--check", stdout=StringIO())
+
+
+def test_profile_shows_stats(client, user_client, user, author_posts):
+    post = author_posts[0]
+    post.is_published = False
+    post.save()
+    url = f"/profile/{user.username}/"
+
+    content = user_client.get(url).content.decode()
+    assert "Публикаций: 3" in content, (
+        "Убедитесь, что автор видит в профиле число всех своих публикаций."
+    )
+    content = client.get(url).content.decode()
+    assert "Публикаций: 2" in content, (
+        "Убедитесь, что остальные видят в профиле число видимых публикаций."
+    )
+    assert "Комментариев: 0" in content
+
+
+@pytest.mark.parametrize("via_moderation", [False, True])
+def test_profile_count_follows_category(
+        client, user, author_posts, published_category, via_moderation
+):
+    url = f"/profile/{user.username}/"
+    assert client.get(url).context["paginator"].count == 3
+    if via_moderation:
+        call_command(
+            "moderate", "categories", "unpublish",
+            "--category", published_category.slug, stdout=StringIO(),
+        )
+    else:
+        published_category.is_published = False
+        published_category.save()
+    assert client.get(url).context["paginator"].count == 0, (
+        "Убедитесь, что после снятия категории с публикации число"
+        " публикаций в профиле не берётся из устаревшего кэша."
+    )
@@ -0,0 +1,156 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.management.commands.bulk_loaddata import iter_json_array
+from blog.models import Category, Comment, Location, Post, SearchTerm, User
+from blog.utils import next_visibility_change
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = settings.BASE_DIR / "db.json"
+
+
+def _load(path, *args):
+    out = StringIO()
+    call_command("bulk_loaddata", str(path), *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_streams(chunk_size):
+    text = DB_JSON.read_text(encoding="utf-8")
+    assert list(
+        iter_json_array(StringIO(text), chunk_size=chunk_size)
+    ) == json.loads(text), (
+        "Убедитесь, что потоковое чтение фикстуры не зависит от того,"
+        " где разрезан файл."
+    )
+    assert list(iter_json_array(StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(StringIO('[{"a": 1}'), chunk_size=3))
+
+
+def test_loads_db_json(client):
+    records = json.loads(DB_JSON.read_text(encoding="utf-8"))
+    expected = {
+        model: sum(1 for record in records if record["model"] == model)
+        for model in ("auth.user", "blog.category", "blog.location",
+                      "blog.post")
+    }
+
+    _load(DB_JSON, "--batch-size", "5")
+
+    assert {
+        "auth.user": User.objects.count(),
+        "blog.category": Category.objects.count(),
+        "blog.location": Location.objects.count(),
+        "blog.post": Post.objects.count(),
+    } == expected, "Убедитесь, что команда загружает все объекты фикстуры."
+    first = next(r for r in records if r["model"] == "blog.post")
+    post = Post.objects.get(pk=first["pk"])
+    assert post.created_at.isoformat().startswith(
+        first["fields"]["created_at"][:19]), (
+        "Убедитесь, что даты создания берутся из фикстуры."
+    )
+    assert post.is_visible, (
+        "Убедитесь, что после загрузки пересчитывается видимость публикаций."
+    )
+    assert SearchTerm.objects.filter(post=post).exists(), (
+        "Убедитесь, что после загрузки строится поисковый индекс."
+    )
+    assert client.get("/").status_code == 200
+    assert Post.objects.create(
+        title="Новая", text="Текст", pub_date=post.pub_date,
+        author=post.author).pk > max(r["pk"] for r in records
+                                     if r["model"] == "blog.post")
+
+
+def test_loads_comments_and_counts(tmp_path, mixer):
+    user = mixer.blend(User)
+    post = mixer.blend("blog.Post", author=user)
+    fixture = tmp_path / "comments.json"
+    fixture.write_text(json.dumps([
+        {
+            "model": "blog.comment",
+            "pk": 100 + number,
+            "fields": {
+                "text": f"Комментарий {number}",
+                "author": user.pk,
+                "post": post.pk,
+                "created_at": "2022-12-18T23:06:18.993Z",
+                "is_published": True,
+            },
+        }
+        for number in range(3)
+    ]), encoding="utf-8")
+
+    _load(fixture)
+
+    assert Comment.objects.filter(post=post).count() == 3
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитываются счётчики"
+        " комментариев."
+    )
+
+
+def test_loaded_scheduled_post_resets_schedule(
+        tmp_path, mixer, published_category
+):
+    user = mixer.blend(User)
+    assert next_visibility_change() is None
+    fixture = tmp_path / "scheduled.json"
+    pub_date = timezone.now() + timedelta(days=1)
+    fixture.write_text(json.dumps([{
+        "model": "blog.post",
+        "pk": 100,
+        "fields": {
+            "title": "Отложенная",
+            "text": "Текст",
+            "author": user.pk,
+            "category": published_category.pk,
+            "pub_date": pub_date.isoformat(),
+            "created_at": "2022-12-18T23:06:18.993Z",
+            "is_published": True,
+            "is_visible": True,
+        },
+    }]), encoding="utf-8")
+
+    _load(fixture)
+
+    assert next_visibility_change() is not None, (
+        "Убедитесь, что после загрузки сбрасывается момент ближайшей"
+        " отложенной публикации."
+    )
+
+
+@pytest.mark.parametrize(
+    "content", ['{"model": "blog.post"}', '[{"model": "blog.post", '])
+def test_rejects_broken_fixture(tmp_path, content):
+    fixture = tmp_path / "broken.json"
+    fixture.write_text(content, encoding="utf-8")
+    with pytest.raises(CommandError):
+        _load(fixture)
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolls_back_on_missing_reference(tmp_path):
+    fixture = tmp_path / "orphans.json"
+    fixture.write_text(json.dumps([
+        {"model": "blog.location", "pk": 1,
+         "fields": {"name": "Место", "is_published": True}},
+        {"model": "blog.comment", "pk": 1,
+         "fields": {"text": "Без публикации", "author": 404, "post": 404}},
+    ]), encoding="utf-8")
+    with pytest.raises(CommandError):
+        _load(fixture)
+    assert not Location.objects.exists(), (
+        "Убедитесь, что загрузка выполняется в одной транзакции."
+    )
@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.cache import attach_card_versions
+from blog.checks import check_shared_cache
+from blog.models import Post
+from blog.utils import (
+    feed_cache_timeout, get_post_info, next_visibility_change,
+    visibility_cutoff)
+from constants import VISIBILITY_BUCKET_SECONDS
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _render_cards(client):
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_cache_invalidation(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in _render_cards(user_client)
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    assert "Новое название категории" in _render_cards(user_client), (
+        "Убедитесь, что карточка публикации перерисовывается после"
+        " изменения её категории."
+    )
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    assert "@renamed_author" in _render_cards(user_client)
+
+    post.title = "Изменённый заголовок"
+    post.save()
+    assert "Изменённый заголовок" in _render_cards(user_client)
+
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Комментарий"})
+    assert "Комментарии (1)" in _render_cards(user_client)
+
+
+def test_post_card_served_from_cache(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    attach_card_versions([post])
+    first = render_to_string("includes/post_card.html", {"post": post})
+    post.title = "Не сохранённый заголовок"
+    second = render_to_string("includes/post_card.html", {"post": post})
+    assert first == second, (
+        "Убедитесь, что карточка публикации берётся из кэша, пока её"
+        " версия не изменилась."
+    )
+
+
+def test_anonymous_pages_cached(
+        client, django_assert_num_queries, post_with_published_location
+):
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/"):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert first.content == second.content, (
+            f"Убедитесь, что страница `{url}` для анонимных посетителей"
+            " отдаётся из кэша."
+        )
+
+
+def test_logged_in_pages_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    response = user_client.get("/")
+    assert "page_obj" in response.context
+
+
+def test_anonymous_page_invalidation(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    client.get("/")
+    client.get(detail_url)
+
+    post.location.name = "Новое место"
+    post.location.save()
+    assert "Новое место" in client.get("/").content.decode("utf-8")
+
+    comment = mixer.blend("blog.Comment", post=post, text="Свежий отзыв")
+    assert "Свежий отзыв" in client.get(detail_url).content.decode("utf-8")
+
+    comment.text = "Исправленный отзыв"
+    comment.save()
+    assert "Исправленный отзыв" in (
+        client.get(detail_url).content.decode("utf-8"))
+
+    new_post = mixer.blend(
+        "blog.Post", category=post.category, title="Совсем новый пост",
+        pub_date=post.pub_date,
+    )
+    assert new_post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кэш главной страницы сбрасывается при появлении"
+        " новой публикации."
+    )
+
+
+def test_scheduled_post_invalidates_feed(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+    # Время публикации наступило; сигналы при этом не срабатывают.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(
+            seconds=2 * VISIBILITY_BUCKET_SECONDS))
+    assert post.title not in client.get("/").content.decode("utf-8")
+
+    call_command("process_scheduled_posts")
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что команда process_scheduled_posts сбрасывает кэш"
+        " лент для наступивших отложенных публикаций."
+    )
+
+
+def test_next_visibility_change(mixer, user, published_category):
+    assert next_visibility_change() is None
+    assert feed_cache_timeout(300) == 300
+
+    pub_date = timezone.now() + timedelta(minutes=3)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=pub_date,
+    )
+    change = next_visibility_change()
+    assert pub_date < change <= pub_date + timedelta(
+        seconds=VISIBILITY_BUCKET_SECONDS), (
+        "Убедитесь, что ближайшая смена видимости совпадает с появлением"
+        " отложенной публикации в ленте."
+    )
+    assert 0 < feed_cache_timeout(3600) <= 4 * 60
+
+
+def test_feed_query_is_stable_within_bucket():
+    first = str(get_post_info().query)
+    second = str(get_post_info().query)
+    assert first == second or visibility_cutoff() != visibility_cutoff(
+        timezone.now() - timedelta(seconds=1)), (
+        "Убедитесь, что текст запроса ленты не меняется в пределах"
+        " шага округления времени."
+    )
+
+
+def test_deploy_check_requires_shared_cache(settings):
+    assert [error.id for error in check_shared_cache(None)] == [
+        "blog.W001"
+    ], "Убедитесь, что check --deploy предупреждает о кэше в памяти процесса."
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "blogicum_cache",
+    }}
+    assert check_shared_cache(None) == []
@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog import mixins
+from blog.utils import category_directory
+from constants import PAGE_CACHE_TIMEOUT
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _directory():
+    return {
+        category["slug"]: (category["post_count"], category["last_pub_date"])
+        for category in category_directory()
+    }
+
+
+@pytest.fixture
+def category_posts(mixer, published_category):
+    return mixer.cycle(2).blend(
+        "blog.Post",
+        category=published_category,
+        is_published=True,
+        pub_date=mixer.sequence(
+            lambda n: timezone.now() - timedelta(days=n + 1)),
+    )
+
+
+def test_directory_counts_visible_posts(
+        mixer, published_category, category_posts
+):
+    hidden = mixer.blend("blog.Category", is_published=False)
+    mixer.blend(
+        "blog.Post", category=hidden, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert _directory() == {
+        published_category.slug: (2, category_posts[0].pub_date),
+    }, (
+        "Убедитесь, что боковая панель показывает только опубликованные"
+        " категории с числом видимых публикаций и датой последней из них."
+    )
+
+
+def test_directory_is_cached_and_invalidated(
+        mixer, published_category, category_posts, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        category_directory()
+    with django_assert_num_queries(0):
+        category_directory()
+
+    category_posts[0].delete()
+    assert _directory()[published_category.slug][0] == 1, (
+        "Убедитесь, что кэш боковой панели сбрасывается при изменении"
+        " публикаций."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert _directory() == {}, (
+        "Убедитесь, что кэш боковой панели сбрасывается при изменении"
+        " категорий."
+    )
+
+
+def test_sidebar_rendered_in_base(client, published_category, category_posts):
+    content = client.get("/pages/about/").content.decode()
+    assert published_category.title in content
+    assert f"/category/{published_category.slug}/" in content, (
+        "Убедитесь, что боковая панель категорий выводится в base.html."
+    )
+
+
+def _sidebar(response):
+    content = response.content.decode()
+    return content[content.index("<aside"):content.index("</aside>")]
+
+
+def test_new_post_elsewhere_refreshes_cached_pages(
+        mixer, client, user_client, published_category, category_posts
+):
+    other = mixer.blend("blog.Category", is_published=True)
+    urls = [
+        f"/posts/{category_posts[0].pk}/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{category_posts[0].author.username}/",
+    ]
+    sidebars = {url: _sidebar(client.get(url)) for url in urls}
+    etags = {url: user_client.get(url)["ETag"] for url in urls}
+
+    mixer.blend(
+        "blog.Post", category=other, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for url in urls:
+        assert _sidebar(client.get(url)) != sidebars[url], (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается вместе"
+            " с боковой панелью категорий."
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что ETag страницы `{url}` меняется вместе"
+            " с боковой панелью категорий."
+        )
+
+
+def test_cached_detail_expires_with_schedule(
+        monkeypatch, mixer, client, published_category, category_posts
+):
+    timeouts = []
+    monkeypatch.setattr(
+        mixins, "set_cached_page",
+        lambda key, response, tags, timeout: timeouts.append(timeout),
+    )
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=2),
+    )
+    client.get(f"/posts/{category_posts[0].pk}/")
+    assert timeouts and timeouts[0] < PAGE_CACHE_TIMEOUT, (
+        "Убедитесь, что кэш страницы публикации живёт не дольше, чем до"
+        " появления отложенной публикации в боковой панели категорий."
+    )
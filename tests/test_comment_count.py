@@ -0,0 +1,126 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import AuthorStats, Post
+from blog.stats import author_stats_values
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_views_update_counter(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comment/"
+    user_client.post(url, {"text": "Первый"})
+    user_client.post(url, {"text": "Второй"})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что создание комментария увеличивает счётчик"
+        " комментариев публикации."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что удаление комментария уменьшает счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_recount_comments_command(
+        mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    assert Post.objects.get(pk=post.pk).comment_count == 3
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    assert "Комментарии (0)" in client.get("/").content.decode()
+
+    with pytest.raises(CommandError):
+        call_command("recount_comments", "--check")
+
+    call_command("recount_comments", "--batch-size", "1")
+    assert Post.objects.get(pk=post.pk).comment_count == 3
+    assert "Комментарии (3)" in client.get("/").content.decode(), (
+        "Убедитесь, что после пересчёта счётчиков карточки публикаций"
+        " сбрасываются из кэша."
+    )
+    call_command("recount_comments", "--check")
+
+
+def test_cascade_delete_updates_counter(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    another_user.delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 0, (
+        "Убедитесь, что счётчик комментариев обновляется и при каскадном"
+        " удалении комментариев, например вместе с их автором."
+    )
+
+
+def _delete_queries(instance):
+    with CaptureQueriesContext(connection) as queries:
+        instance.delete()
+    return len(queries)
+
+
+def test_post_delete_queries_do_not_grow(mixer, user, another_user):
+    def delete_queries(n_comments):
+        post = mixer.blend("blog.Post", author=user)
+        mixer.cycle(n_comments).blend(
+            "blog.Comment", post=post,
+            author=mixer.sequence(user, another_user),
+        )
+        return _delete_queries(post)
+
+    assert delete_queries(4) == delete_queries(20), (
+        "Убедитесь, что удаление публикации не обновляет счётчики"
+        " по одному запросу на каждый её комментарий."
+    )
+    assert author_stats_values([another_user.pk])[another_user.pk][
+        "comment_count"] == AuthorStats.objects.get(
+            user=another_user).comment_count == 0
+
+
+def test_user_delete_updates_counters(mixer, user, another_user):
+    own_post, other_post = mixer.cycle(2).blend(
+        "blog.Post", author=mixer.sequence(another_user, user))
+    mixer.cycle(3).blend("blog.Comment", post=other_post, author=another_user)
+    mixer.cycle(2).blend("blog.Comment", post=own_post, author=user)
+    mixer.blend("blog.Comment", post=own_post, author=another_user)
+
+    another_user.delete()
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 0, (
+        "Убедитесь, что при удалении пользователя счётчики чужих"
+        " публикаций уменьшаются на число его комментариев."
+    )
+    assert AuthorStats.objects.get(user=user).comment_count == 0
+
+
+def test_cancelled_delete_keeps_counting(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend("blog.Comment", post=post)
+
+    def fail(**kwargs):
+        raise RuntimeError
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+
+    comments[0].delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 1, (
+        "Убедитесь, что отменённое удаление публикации не выключает"
+        " счётчик комментариев."
+    )
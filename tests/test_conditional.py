@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.models import Category, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        reverse("blog:post_detail", args=[post.id]),
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:profile", args=[post.author.username]),
+    ]
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_pages_answer_304(client_name, request, page_urls):
+    client = request.getfixturevalue(client_name)
+    for url in page_urls:
+        # Второй анонимный запрос отдаётся из кэша страниц.
+        for _ in range(2):
+            response = client.get(url)
+            assert response.status_code == 200
+            etag = response["ETag"]
+            assert "Cookie" in response["Vary"], (
+                f"Убедитесь, что страница `{url}` отдаёт `Vary: Cookie`."
+            )
+
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f"Убедитесь, что страница `{url}` отвечает 304, если ETag"
+                " не изменился."
+            )
+        if "posts" in url:
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+            assert response.status_code == 304
+
+
+def test_feed_pages_have_no_last_modified(
+        mixer, client, page_urls, post_with_published_location
+):
+    post = post_with_published_location
+    for url in page_urls[1:]:
+        assert not client.get(url).has_header("Last-Modified"), (
+            f"Убедитесь, что лента `{url}` отдаёт только ETag: состав"
+            " страницы меняется без изменения `updated_at` её публикаций."
+        )
+
+    # Отложенная публикация, созданная раньше, появляется в ленте.
+    mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    Post.objects.update(updated_at=timezone.now() - timedelta(days=1))
+    since = http_date(timezone.now().timestamp())
+    for url in page_urls[1:]:
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200
+
+
+def test_etag_depends_on_user(client, user_client, page_urls):
+    for url in page_urls:
+        assert client.get(url)["ETag"] != user_client.get(url)["ETag"], (
+            f"Убедитесь, что ETag страницы `{url}` зависит от пользователя."
+        )
+
+
+@pytest.mark.parametrize(
+    "change",
+    ["post", "category", "location", "comment", "author"],
+)
+def test_etag_changes_with_content(
+        change, mixer, client, page_urls, post_with_published_location
+):
+    post = post_with_published_location
+    etags = [client.get(url)["ETag"] for url in page_urls]
+
+    if change == "post":
+        post.text = "Новый текст"
+        post.save()
+    elif change == "category":
+        post.category.title = "Новое название"
+        post.category.save()
+    elif change == "location":
+        post.location.name = "Новое место"
+        post.location.save()
+    elif change == "comment":
+        mixer.blend("blog.Comment", post=post)
+    else:
+        post.author.first_name = "Новое имя"
+        post.author.save()
+
+    for url, etag in zip(page_urls, etags):
+        if change == "comment" and "posts" not in url:
+            continue
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что ETag страницы `{url}` меняется при изменении"
+            f" `{change}`."
+        )
+
+
+def test_comment_edit_updates_last_modified(
+        user_client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = reverse("blog:post_detail", args=[post.id])
+    # Last-Modified точен до секунды: сдвигаем время изменения назад.
+    old_updated_at = timezone.now() - timedelta(minutes=1)
+    for model in (Post, Category, Location):
+        model.objects.update(updated_at=old_updated_at)
+    last_modified = user_client.get(url)["Last-Modified"]
+    user_client.post(
+        reverse("blog:edit_comment", args=[post.id, comment.id]),
+        {"text": "Исправленный комментарий"},
+    )
+    post.refresh_from_db()
+    assert post.updated_at > old_updated_at, (
+        "Убедитесь, что правка комментария обновляет `updated_at`"
+        " публикации."
+    )
+    response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        "Убедитесь, что после правки комментария страница публикации"
+        " не отвечает 304 на запрос с If-Modified-Since."
+    )
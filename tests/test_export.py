@@ -0,0 +1,80 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    return client
+
+
+def _export(*args):
+    out = StringIO()
+    call_command("export_content", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_command_exports_denormalized_posts(post_with_published_location):
+    post = post_with_published_location
+    rows = [json.loads(line) for line in _export("posts").splitlines()]
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["id"] == post.id
+    assert row["author"] == post.author.username, (
+        "Убедитесь, что в выгрузке публикаций есть имя автора."
+    )
+    assert row["category_slug"] == post.category.slug
+    assert row["location"] == post.location.name
+    assert row["pub_date"] == post.pub_date.isoformat()
+
+
+def test_command_exports_comments_csv(
+        tmp_path, mixer, post_with_published_location
+):
+    comments = mixer.cycle(5).blend(
+        "blog.Comment", post=post_with_published_location)
+    output = tmp_path / "comments.csv"
+    call_command(
+        "export_content", "comments", "--format", "csv",
+        "--chunk-size", "2", "--output", str(output))
+
+    with open(output, encoding="utf-8", newline="") as stream:
+        rows = list(csv.DictReader(stream))
+    assert [int(row["id"]) for row in rows] == [c.id for c in comments], (
+        "Убедитесь, что выгрузка не теряет строки при чтении пачками."
+    )
+    assert rows[0]["post_title"] == post_with_published_location.title
+
+
+def test_export_view_is_staff_only(client, user_client, staff_client):
+    url = reverse("blog:export", args=["posts", "csv"])
+    assert client.get(url).status_code == 302
+    assert user_client.get(url).status_code == 403, (
+        "Убедитесь, что выгрузка доступна только сотрудникам."
+    )
+    assert staff_client.get(
+        reverse("blog:export", args=["users", "csv"])).status_code == 404
+
+
+def test_export_view_streams(
+        staff_client, django_assert_num_queries, post_with_published_location
+):
+    response = staff_client.get(
+        reverse("blog:export", args=["posts", "jsonl"]))
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся потоковым ответом."
+    )
+    assert "attachment" in response["Content-Disposition"]
+    with django_assert_num_queries(1):
+        content = b"".join(response.streaming_content).decode("utf-8")
+    assert json.loads(content)["id"] == post_with_published_location.id
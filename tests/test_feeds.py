@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        reverse("blog:feed_rss"),
+        reverse("blog:feed_atom"),
+        reverse("blog:category_rss", args=[post.category.slug]),
+        reverse("blog:category_atom", args=[post.category.slug]),
+        reverse("blog:profile_rss", args=[post.author.username]),
+        reverse("blog:profile_atom", args=[post.author.username]),
+    ]
+
+
+def test_feeds_list_visible_posts(
+        client, feed_urls, post_with_published_location, mixer
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        is_published=False)
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что лента `{url}` доступна."
+        )
+        assert response["Content-Type"].startswith(
+            "application/atom+xml" if url.endswith("atom/")
+            else "application/rss+xml")
+        content = response.content.decode()
+        assert post.get_absolute_url() in content
+        assert hidden.get_absolute_url() not in content, (
+            f"Убедитесь, что лента `{url}` не показывает скрытые публикации."
+        )
+
+
+def test_feed_of_unpublished_category_404(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    response = client.get(reverse("blog:category_rss", args=[category.slug]))
+    assert response.status_code == 404
+
+
+def test_feeds_conditional_get(
+        client, feed_urls, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    for url in feed_urls:
+        response = client.get(url)
+        etag = response["ETag"]
+        assert etag and response["Last-Modified"], (
+            f"Убедитесь, что лента `{url}` отдаёт ETag и Last-Modified."
+        )
+
+        # Объект ленты и дата последней публикации, без выборки записей.
+        with django_assert_max_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что лента `{url}` отвечает 304 на повторный опрос."
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        assert response.status_code == 304
+
+    etags = [client.get(url)["ETag"] for url in feed_urls]
+    post.title = "Изменённый заголовок"
+    post.save()
+    for url, etag in zip(feed_urls, etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что ETag ленты `{url}` меняется при изменении"
+            " публикации."
+        )
+        assert "Изменённый заголовок" in response.content.decode()
+
+
+def test_feed_etag_changes_when_scheduled_post_appears(
+        client, post_with_published_location, mixer
+):
+    post = post_with_published_location
+    post.pub_date = timezone.now() - timedelta(days=2)
+    post.save()
+    url = reverse("blog:feed_rss")
+    scheduled = mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1))
+    etag = client.get(url)["ETag"]
+
+    # Время публикации наступило, сигналы при этом не срабатывали.
+    type(scheduled).objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(hours=1))
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert scheduled.get_absolute_url() in response.content.decode()
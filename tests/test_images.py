@@ -0,0 +1,156 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.images import derivative_name
+from blog.models import ImageJob
+from constants import POST_IMAGE_MAX_BYTES, POST_IMAGE_VARIANTS
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _photo(width=3000, height=2000, exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(
+        buffer, "JPEG", exif=exif or Image.Exif())
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+
+
+def _process_jobs():
+    call_command("process_image_jobs", "--once", "--workers", "0")
+
+
+@pytest.fixture
+def post_with_photo(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_photo())
+
+
+def test_upload_enqueues_job(post_with_photo, media_root):
+    job = ImageJob.objects.get(post=post_with_photo)
+    assert job.status == ImageJob.Status.PENDING, (
+        "Убедитесь, что загруженное фото ставится в очередь на обработку."
+    )
+    assert not (media_root / derivative_name(
+        post_with_photo.image.name, "card", "jpg")).exists(), (
+        "Убедитесь, что фото не обрабатывается во время запроса."
+    )
+
+    post_with_photo.title = "Новый заголовок"
+    post_with_photo.save()
+    assert ImageJob.objects.filter(post=post_with_photo).count() == 1, (
+        "Убедитесь, что задача создаётся только при смене фото."
+    )
+
+
+def test_worker_creates_derivatives(post_with_photo, media_root):
+    _process_jobs()
+
+    job = ImageJob.objects.get(post=post_with_photo)
+    assert job.status == ImageJob.Status.DONE
+    assert job.attempts == 1
+    for variant, width in POST_IMAGE_VARIANTS.items():
+        for extension, pillow_format in (("webp", "WEBP"), ("jpg", "JPEG")):
+            path = media_root / derivative_name(
+                post_with_photo.image.name, variant, extension)
+            assert path.exists(), (
+                f"Убедитесь, что воркер создаёт `{path.name}`."
+            )
+            with Image.open(path) as image:
+                assert image.format == pillow_format
+                # Исходник 3000 пикселей: больше него вариант не растёт.
+                assert image.width == min(width, 3000)
+
+
+def test_worker_strips_exif(mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_photo(width=100, height=100, exif=exif))
+    with Image.open(post.image.path) as image:
+        assert image.getexif()
+
+    _process_jobs()
+
+    with Image.open(post.image.path) as image:
+        assert not image.getexif(), (
+            "Убедитесь, что из оригинала фото удаляются EXIF-данные."
+        )
+
+
+def test_post_card_serves_derivatives(client, post_with_photo):
+    content = client.get("/").content.decode("utf-8")
+    assert f'src="{post_with_photo.image.url}"' in content, (
+        "Убедитесь, что до обработки фото показывается оригинал."
+    )
+
+    _process_jobs()
+
+    content = client.get("/").content.decode("utf-8")
+    card_url = derivative_name(post_with_photo.image.url, "card", "jpg")
+    assert f'src="{card_url}"' in content, (
+        "Убедитесь, что после обработки карточка публикации показывает"
+        " уменьшенную копию фото, а не оригинал."
+    )
+    assert 'type="image/webp"' in content
+
+    content = client.get(
+        f"/posts/{post_with_photo.id}/").content.decode("utf-8")
+    assert derivative_name(
+        post_with_photo.image.url, "detail", "webp") in content
+
+
+def test_broken_image_job_fails(mixer, client, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category)
+    post.image.save("broken.jpg", ContentFile(b"not an image"))
+
+    _process_jobs()
+
+    job = ImageJob.objects.get(post=post, image=post.image.name)
+    assert job.status == ImageJob.Status.FAILED, (
+        "Убедитесь, что повреждённое фото не обрабатывается повторно."
+    )
+    assert job.error
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert f'src="{post.image.url}"' in content
+
+
+def test_post_form_rejects_large_image(published_category):
+    photo = _photo(width=10, height=10)
+    photo.size = POST_IMAGE_MAX_BYTES + 1
+    form = PostForm(
+        data={
+            "title": "Заголовок",
+            "text": "Текст",
+            "pub_date": "2020-01-01 00:00",
+            "category": published_category.id,
+        },
+        files={"image": photo},
+    )
+    assert not form.is_valid()
+    assert "image" in form.errors, (
+        "Убедитесь, что форма публикации отклоняет слишком большие фото."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_process_pool(post_with_photo, media_root):
+    call_command("process_image_jobs", "--once", "--workers", "2")
+    assert ImageJob.objects.get(
+        post=post_with_photo).status == ImageJob.Status.DONE
+    assert (media_root / derivative_name(
+        post_with_photo.image.name, "retina", "webp")).exists()
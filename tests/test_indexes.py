@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment
+from blog.utils import get_post_info
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _feed_querysets(user, category):
+    return {
+        "index": (get_post_info(), "post_published_feed_idx"),
+        "category": (
+            get_post_info(category.posts.all()), "post_category_feed_idx"),
+        "profile": (
+            get_post_info(user.posts.all(), apply_default_filters=False),
+            "post_author_feed_idx",
+        ),
+        "comments": (
+            Comment.objects.filter(post_id=1).order_by("created_at", "id"),
+            "comment_post_created_idx",
+        ),
+    }
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Проверка плана запроса SQLite.")
+def test_feed_indexes_sqlite(user, published_category):
+    for name, (queryset, index) in _feed_querysets(
+            user, published_category).items():
+        plan = queryset[:10].explain()
+        assert f"USING INDEX {index}" in plan, (
+            f"Убедитесь, что запрос ленты `{name}` использует индекс"
+            f" `{index}`:\n{plan}"
+        )
+        assert "TEMP B-TREE" not in plan, (
+            f"Убедитесь, что запрос ленты `{name}` не сортирует строки"
+            f" отдельно от индекса:\n{plan}"
+        )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Проверка плана запроса PostgreSQL.")
+def test_feed_indexes_postgresql(user, published_category):
+    with connection.cursor() as cursor:
+        # На почти пустых таблицах планировщик предпочёл бы Seq Scan.
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    for name, (queryset, index) in _feed_querysets(
+            user, published_category).items():
+        plan = queryset[:10].explain()
+        assert index in plan, (
+            f"Убедитесь, что запрос ленты `{name}` использует индекс"
+            f" `{index}`:\n{plan}"
+        )
@@ -0,0 +1,209 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, SearchTerm
+from blog.moderation import CategoryModeration
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _moderate(*args):
+    out = StringIO()
+    call_command("moderate", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def spam_posts(mixer, another_user, published_category):
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=another_user,
+        category=published_category,
+        is_published=True,
+        title=mixer.sequence(lambda n: f"Спам {n}"),
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _index_titles(client):
+    return {post.title for post in client.get("/").context["page_obj"]}
+
+
+def test_unpublish_and_publish_posts(client, another_user, spam_posts):
+    titles = {post.title for post in spam_posts}
+    assert titles <= _index_titles(client)
+
+    assert "Подходит объектов: 5" in _moderate(
+        "posts", "unpublish", "--author", another_user.username, "--dry-run")
+    assert Post.objects.filter(is_visible=True).count() == 5, (
+        "Убедитесь, что --dry-run ничего не меняет."
+    )
+
+    _moderate(
+        "posts", "unpublish", "--author", another_user.username,
+        "--chunk-size", "2")
+    assert not Post.objects.filter(is_published=True).exists()
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert not titles & _index_titles(client), (
+        "Убедитесь, что после массового снятия с публикации лента"
+        " сбрасывается из кэша."
+    )
+
+    _moderate("posts", "publish", "--text", "Спам")
+    assert titles <= _index_titles(client)
+
+
+def test_delete_comments_updates_counts(mixer, spam_posts):
+    post = spam_posts[0]
+    for text in ("Купите слона", "Купите слона", "Хороший пост"):
+        mixer.blend("blog.Comment", post=post, text=text)
+    call_command("recount_comments", stdout=StringIO())
+
+    _moderate("comments", "delete", "--text", "слона", "--chunk-size", "1")
+    post.refresh_from_db()
+    assert list(Comment.objects.values_list("text", flat=True)) == [
+        "Хороший пост"]
+    assert post.comment_count == 1, (
+        "Убедитесь, что массовое удаление комментариев обновляет счётчик."
+    )
+
+
+def test_delete_posts_with_related(mixer, spam_posts, published_category):
+    mixer.blend("blog.Comment", post=spam_posts[0])
+    _moderate("posts", "delete", "--category", published_category.slug)
+    assert not Post.objects.exists()
+    assert not Comment.objects.exists()
+    assert not SearchTerm.objects.exists(), (
+        "Убедитесь, что вместе с публикациями удаляется их поисковый индекс."
+    )
+
+
+def test_unpublish_category_hides_posts(
+        client, spam_posts, published_category
+):
+    _moderate(
+        "categories", "unpublish", "--category", published_category.slug)
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert client.get(
+        f"/category/{published_category.slug}/").status_code == 404
+
+
+def test_category_chunk_queries_do_not_grow(mixer, user):
+    def unpublish_queries(count):
+        categories = mixer.cycle(count).blend(
+            "blog.Category", is_published=True)
+        for category in categories:
+            mixer.blend(
+                "blog.Post", category=category, author=user,
+                is_published=True,
+                pub_date=timezone.now() - timedelta(days=1),
+            )
+        with CaptureQueriesContext(connection) as queries:
+            CategoryModeration().set_published(
+                [category.pk for category in categories], False)
+        return len(queries)
+
+    assert unpublish_queries(1) == unpublish_queries(3), (
+        "Убедитесь, что пачка категорий снимается с публикации"
+        " одинаковым числом запросов, а не по запросу на категорию."
+    )
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert not Category.objects.filter(is_published=True).exists()
+
+
+def test_command_requires_filter(spam_posts):
+    with pytest.raises(CommandError):
+        _moderate("posts", "delete")
+    with pytest.raises(CommandError):
+        _moderate("locations", "delete", "--author", "someone")
+    assert Post.objects.count() == 5
+    _moderate("posts", "unpublish", "--all")
+    assert not Post.objects.filter(is_published=True).exists()
+
+
+def test_admin_actions(admin_client, mixer, spam_posts):
+    url = reverse("admin:blog_post_changelist")
+    response = admin_client.post(url, {
+        "action": "unpublish_selected",
+        "_selected_action": [post.id for post in spam_posts[:2]],
+    })
+    assert response.status_code == 302
+    assert Post.objects.filter(is_visible=False).count() == 2, (
+        "Убедитесь, что в админке есть массовое снятие с публикации."
+    )
+
+    post = spam_posts[2]
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    call_command("recount_comments", stdout=StringIO())
+    admin_client.post(reverse("admin:blog_comment_changelist"), {
+        "action": "delete_selected",
+        "_selected_action": [comment.id for comment in comments[:2]],
+        "post": "yes",
+    })
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_unpublished_comments_are_hidden(
+        mixer, client, user, user_client, spam_posts
+):
+    post = spam_posts[0]
+    spam = mixer.cycle(2).blend(
+        "blog.Comment", post=post, author=user, text="Купите слона")
+    mixer.blend("blog.Comment", post=post, text="Хороший пост")
+    detail_url = f"/posts/{post.pk}/"
+    api_url = f"/api/posts/{post.pk}/comments/"
+    assert "Купите слона" in client.get(detail_url).content.decode()
+
+    _moderate("comments", "unpublish", "--text", "слона")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик комментариев учитывает только"
+        " опубликованные комментарии."
+    )
+    assert "Купите слона" not in client.get(detail_url).content.decode(), (
+        "Убедитесь, что снятые с публикации комментарии не видны"
+        " посетителям."
+    )
+    assert [
+        comment["text"] for comment in client.get(api_url).json()["results"]
+    ] == ["Хороший пост"], (
+        "Убедитесь, что API не отдаёт снятые с публикации комментарии."
+    )
+    assert "Купите слона" in user_client.get(detail_url).content.decode(), (
+        "Убедитесь, что автор видит свои снятые с публикации комментарии."
+    )
+
+    Comment.objects.get(pk=spam[0].pk).delete()
+    _moderate("comments", "publish", "--all")
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    call_command("recount_comments", "--check", stdout=StringIO())
+
+
+def test_admin_toggles_comment_count(admin_client, mixer, spam_posts):
+    post = spam_posts[0]
+    comment = mixer.blend("blog.Comment", post=post)
+    url = reverse("admin:blog_comment_changelist")
+    for is_published, count in ((False, 0), (False, 0), (True, 1)):
+        data = {
+            "form-TOTAL_FORMS": "1",
+            "form-INITIAL_FORMS": "1",
+            "form-0-id": str(comment.pk),
+            "_save": "Сохранить",
+        }
+        if is_published:
+            data["form-0-is_published"] = "on"
+        assert admin_client.post(url, data).status_code == 302
+        post.refresh_from_db()
+        assert post.comment_count == count, (
+            "Убедитесь, что переключение `is_published` в списке"
+            " комментариев обновляет счётчик публикации."
+        )
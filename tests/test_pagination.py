@@ -0,0 +1,200 @@
+import base64
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import KeysetPaginator, PostPaginator
+from blog.utils import get_post_count_queryset, get_post_info
+from conftest import N_PER_PAGE
+from constants import QNT_COMMENTS_ON_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def keyset_mode(monkeypatch):
+    from blog.mixins import KeysetPaginationMixin
+
+    monkeypatch.setattr(KeysetPaginationMixin, "pagination_mode", "keyset")
+
+
+def _collect_feed(client: Client, url: str):
+    seen = []
+    cursor = None
+    for _ in range(10):
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == 200, (
+            "Убедитесь, что страницы ленты с курсорной пагинацией"
+            " загружаются без ошибок."
+        )
+        page = response.context["page_obj"]
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+        assert f"?cursor={cursor}" in response.content.decode("utf-8"), (
+            "Убедитесь, что ссылка на следующую страницу содержит курсор."
+        )
+    return seen
+
+
+def test_keyset_walks_whole_feed(
+        keyset_mode, client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    seen = _collect_feed(client, "/")
+    expected = [
+        post.id for post in sorted(
+            posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+    ]
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация обходит ленту без пропусков"
+        " и повторов, от новых публикаций к старым."
+    )
+
+
+def test_keyset_previous_page(
+        keyset_mode, client, many_posts_with_published_locations
+):
+    first = client.get("/").context["page_obj"]
+    second = client.get("/", {"cursor": first.next_cursor}).context["page_obj"]
+    back = client.get(
+        "/", {"cursor": second.previous_cursor}).context["page_obj"]
+    assert [p.id for p in back] == [p.id for p in first], (
+        "Убедитесь, что ссылка на предыдущую страницу возвращает"
+        " к исходной странице ленты."
+    )
+    assert not back.has_previous()
+
+
+def _raw_cursor(value):
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Подделанные курсоры: значения ключа не тех типов или вне диапазона.
+MALFORMED_CURSORS = [
+    ["n", [{}, 1]],
+    ["n", [[1], 1]],
+    ["n", ["2020-01-01T00:00:00+00:00", {}]],
+    ["n", ["2020-01-01T00:00:00+00:00", [1]]],
+    ["n", [None, 1]],
+    ["n", ["2020-01-01T00:00:00+00:00", 10 ** 30]],
+    ["n", ["2020-01-01T00:00:00+00:00", 1e308 * 10]],
+    ["n", ["не дата", 1]],
+    ["x", ["2020-01-01T00:00:00+00:00", 1]],
+    ["n", ["2020-01-01T00:00:00+00:00"]],
+    {"n": 1},
+]
+
+
+def test_keyset_invalid_cursor(keyset_mode, client):
+    response = client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("value", MALFORMED_CURSORS)
+def test_keyset_malformed_cursor(keyset_mode, client, value):
+    response = client.get("/", {"cursor": _raw_cursor(value)})
+    assert response.status_code == 404, (
+        "Убедитесь, что подделанный курсор приводит к ответу 404,"
+        " а не к ошибке сервера."
+    )
+
+
+def test_keyset_ties_on_pub_date(mixer, user, published_category):
+    posts = mixer.cycle(N_PER_PAGE + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+    )
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    first = paginator.page()
+    second = paginator.page(first.next_cursor)
+    ids = [p.id for p in first] + [p.id for p in second]
+    assert sorted(ids, reverse=True) == ids
+    assert set(ids) == {p.id for p in posts}
+    assert re.fullmatch(r"[\w-]+", first.next_cursor)
+
+
+
+def _is_count_query(query):
+    return query["sql"].startswith("SELECT COUNT(")
+
+
+@pytest.mark.parametrize("count_mode", ["exact", "has_more"])
+def test_post_paginator_count_modes(
+        count_mode, mixer, user, published_category
+):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category)
+    paginator = PostPaginator(
+        get_post_info(),
+        N_PER_PAGE,
+        count_queryset=get_post_count_queryset(),
+        count_mode=count_mode,
+    )
+    first = paginator.page(1)
+    second = paginator.page(2)
+    assert len(first) == N_PER_PAGE and first.has_next()
+    assert len(second) == 1 and not second.has_next()
+
+
+def test_post_count_query_is_lean(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    count_queries = [q["sql"] for q in ctx.captured_queries
+                     if _is_count_query(q)]
+    assert len(count_queries) == 1
+    assert "blog_location" not in count_queries[0], (
+        "Убедитесь, что количество публикаций считается без подгрузки"
+        " связанных моделей."
+    )
+    assert "auth_user" not in count_queries[0]
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    assert not any(_is_count_query(q) for q in ctx.captured_queries), (
+        "Убедитесь, что количество публикаций ленты кэшируется."
+    )
+
+
+def test_comment_fragment_pages(
+        mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(QNT_COMMENTS_ON_PAGE + 2).blend(
+        "blog.Comment", post=post)
+
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert len(page) == QNT_COMMENTS_ON_PAGE, (
+        "Убедитесь, что на странице публикации комментарии выводятся"
+        " постранично."
+    )
+    assert page.has_next()
+
+    fragment = client.get(
+        f"/posts/{post.id}/comments/",
+        {"comments_cursor": page.next_cursor},
+    )
+    assert fragment.status_code == 200
+    expected = sorted(comments, key=lambda c: (c.created_at, c.id))[-2:]
+    assert [c.id for c in fragment.context["comments"]] == [
+        c.id for c in expected
+    ]
+    assert "<html" not in fragment.content.decode("utf-8")
+
+
+def test_comment_fragment_hidden_post(client, posts_with_unpublished_category):
+    post = posts_with_unpublished_category[0]
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
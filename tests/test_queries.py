@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь для авторизованного клиента.
+AUTH_QUERIES = 2
+# Боковая панель категорий в base.html, пока её нет в кэше.
+SIDEBAR_QUERIES = 1
+
+
+@pytest.mark.parametrize("n_comments", [0, 5])
+def test_post_detail_query_budget(
+        n_comments, mixer, client, user_client, django_assert_num_queries,
+        post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    url = f"/posts/{post.id}/"
+
+    # Публикация со связанными моделями, список комментариев и ближайшая
+    # отложенная публикация: от неё зависят срок кэша и ETag страницы.
+    with django_assert_num_queries(3 + SIDEBAR_QUERIES):
+        response = client.get(url)
+    assert response.status_code == 200
+
+    # Боковая панель уже в кэше.
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        response = user_client.get(url)
+    assert response.status_code == 200
+
+
+def test_post_detail_hidden_post_single_query(
+        client, django_assert_num_queries, posts_with_unpublished_category
+):
+    post = posts_with_unpublished_category[0]
+    with django_assert_num_queries(1):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    post.comment_count = 1
+    post.save()
+    return mixer.blend("blog.Comment", post=post, author=user)
+
+
+# Сессия, пользователь и объект вместе с автором — одним запросом.
+# Сверх этого: выбор локаций и категорий в форме публикации, проверка
+# категории и прежние значения полей при сохранении, переиндексация
+# для поиска, каскадное удаление комментариев, задач обработки фото
+# и поискового индекса, точка сохранения, пересчёт comment_count
+# и отметка времени изменения публикации при правке комментария.
+@pytest.mark.parametrize(
+    "url_name, method, data, expected_queries",
+    [
+        ("blog:edit_post", "get", None, 5 + SIDEBAR_QUERIES),
+        ("blog:edit_post", "post", "post_form", 12),
+        ("blog:delete_post", "get", None, 3 + SIDEBAR_QUERIES),
+        ("blog:delete_post", "post", {}, 11),
+        ("blog:edit_comment", "get", None, 3 + SIDEBAR_QUERIES),
+        ("blog:edit_comment", "post", {"text": "Новый текст"}, 5),
+        ("blog:delete_comment", "get", None, 3 + SIDEBAR_QUERIES),
+        ("blog:delete_comment", "post", {}, 6),
+    ],
+)
+def test_author_only_views_query_budget(
+        url_name, method, data, expected_queries, user_client, own_comment,
+        django_assert_num_queries,
+):
+    post = own_comment.post
+    args = [post.id]
+    if "comment" in url_name:
+        args.append(own_comment.id)
+    if data == "post_form":
+        data = {
+            "title": "Новый заголовок",
+            "text": "Новый текст",
+            "pub_date": "2020-01-01 00:00",
+            "category": post.category_id,
+        }
+    url = reverse(url_name, args=args)
+    with django_assert_num_queries(expected_queries):
+        response = getattr(user_client, method)(url, data)
+    assert response.status_code == (302 if method == "post" else 200), (
+        f"Убедитесь, что страница `{url}` доступна автору."
+    )
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post, SearchTerm
+from constants import QNT_POSTS_ON_MAIN
+
+pytestmark = [pytest.mark.django_db]
+
+URL = "/search/"
+
+
+def _found(client, query, **params):
+    response = client.get(URL, {"q": query, **params})
+    assert response.status_code == 200
+    return list(response.context["page_obj"])
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text="", **kwargs):
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            pub_date=timezone.now() - timedelta(days=1), **kwargs)
+    return make
+
+
+def test_search_uses_russian_stemming(client, make_post):
+    post = make_post("Прогулка по набережной", "Смотрели на корабли.")
+    make_post("Другое", "Совсем о другом.")
+
+    assert _found(client, "прогулки") == [post], (
+        "Убедитесь, что поиск находит публикацию по другой форме слова."
+    )
+    assert _found(client, "КОРАБЛЯМИ") == [post]
+    assert _found(client, "прогулка самолёт") == [], (
+        "Убедитесь, что поиск находит публикации со всеми словами запроса."
+    )
+    assert _found(client, "") == []
+
+
+def test_search_ranks_title_above_text(client, make_post):
+    in_text = make_post("Заметка", "Сегодня пекли пироги.")
+    in_title = make_post("Пироги с капустой", "Рецепт.")
+    assert _found(client, "пирог") == [in_title, in_text], (
+        "Убедитесь, что совпадение в заголовке ранжируется выше."
+    )
+
+
+def test_search_respects_visibility(
+        client, mixer, make_post, published_category
+):
+    visible = make_post("Скрытые сокровища")
+    make_post("Скрытые сокровища", is_published=False)
+    make_post(
+        "Скрытые сокровища",
+        category=mixer.blend("blog.Category", is_published=False))
+    future = make_post("Скрытые сокровища")
+    future.pub_date = timezone.now() + timedelta(days=1)
+    future.save()
+
+    assert _found(client, "сокровища") == [visible], (
+        "Убедитесь, что поиск показывает только опубликованные публикации."
+    )
+
+
+def test_search_index_follows_post_changes(client, make_post):
+    post = make_post("Старый заголовок")
+    assert _found(client, "старый") == [post]
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert _found(client, "старый") == []
+    assert _found(client, "новый") == [post], (
+        "Убедитесь, что индекс обновляется при изменении публикации."
+    )
+
+    post.delete()
+    assert not SearchTerm.objects.exists()
+
+
+def test_search_pagination_keeps_query(client, make_post):
+    for i in range(QNT_POSTS_ON_MAIN + 1):
+        make_post(f"Путешествие {i}")
+    make_post("Другое")
+
+    response = client.get(URL, {"q": "путешествия"})
+    assert len(response.context["page_obj"]) == QNT_POSTS_ON_MAIN
+    next_page = "?" + urlencode({"q": "путешествия", "page": 2})
+    assert next_page.replace("&", "&amp;") in response.content.decode(), (
+        "Убедитесь, что ссылки пагинатора сохраняют поисковый запрос."
+    )
+    assert len(_found(client, "путешествия", page=2)) == 1
+
+
+def test_search_query_count(
+        client, make_post, django_assert_num_queries
+):
+    for i in range(5):
+        make_post(f"Путешествие {i}")
+    # Количество результатов и страница публикаций со связанными моделями.
+    # Боковая панель категорий — из кэша.
+    client.get(URL)
+    with django_assert_num_queries(2):
+        client.get(URL, {"q": "путешествие"})
+
+
+def test_rebuild_search_index(client, make_post):
+    post = make_post("Горное озеро")
+    Post.objects.filter(pk=post.pk).update(title="Лесное озеро")
+    assert _found(client, "лесное") == []
+
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert _found(client, "лесное") == [post]
+    assert _found(client, "горное") == []
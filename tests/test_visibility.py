@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.utils import (
+    get_post_count_queryset, get_post_info, next_visibility_change)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _is_visible(post):
+    return Post.objects.values_list("is_visible", flat=True).get(pk=post.pk)
+
+
+def test_post_visibility_follows_post_and_category(
+        post_with_published_location
+):
+    post = post_with_published_location
+    category = post.category
+    assert _is_visible(post)
+
+    post.is_published = False
+    post.save()
+    assert not _is_visible(post), (
+        "Убедитесь, что снятая с публикации запись скрывается из лент."
+    )
+
+    post.is_published = True
+    post.save(update_fields=["is_published"])
+    assert _is_visible(post), (
+        "Убедитесь, что `is_visible` обновляется и при сохранении"
+        " с `update_fields`."
+    )
+
+    category.is_published = False
+    category.save()
+    assert not _is_visible(post), (
+        "Убедитесь, что снятие категории с публикации скрывает её записи."
+    )
+
+    category.is_published = True
+    category.save()
+    assert _is_visible(post)
+
+    category.delete()
+    assert not _is_visible(post)
+
+
+def test_feed_queries_skip_category_join():
+    count_sql = str(get_post_count_queryset().query)
+    assert "JOIN" not in count_sql, (
+        "Убедитесь, что подсчёт публикаций ленты не соединяет таблицы."
+    )
+    assert "blog_category" not in str(
+        get_post_info(join_related=False).query)
+
+
+def test_refresh_post_visibility(client, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+
+    with pytest.raises(CommandError):
+        call_command("refresh_post_visibility", "--check", stdout=StringIO())
+    call_command("refresh_post_visibility", stdout=StringIO())
+    assert _is_visible(post)
+
+    url = f"/posts/{post.pk}/"
+    assert client.get(url).status_code == 200
+    Post.objects.filter(pk=post.pk).update(category=None)
+    call_command("refresh_post_visibility", stdout=StringIO())
+    assert not _is_visible(post), (
+        "Убедитесь, что публикация без категории не попадает в ленты."
+    )
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что скрытая командой публикация сбрасывается из кэша"
+        " страниц."
+    )
+    call_command("refresh_post_visibility", "--check", stdout=StringIO())
+
+
+def test_refresh_post_visibility_resets_schedule(
+        post_with_published_location
+):
+    post = post_with_published_location
+    assert next_visibility_change() is None
+    Post.objects.filter(pk=post.pk).update(
+        is_visible=False, pub_date=timezone.now() + timedelta(days=1))
+    call_command("refresh_post_visibility", stdout=StringIO())
+    assert next_visibility_change() is not None, (
+        "Убедитесь, что после пересчёта видимости сбрасывается момент"
+        " ближайшей отложенной публикации."
+    )